@@ -0,0 +1,55 @@
+"""add hot query indexes
+
+Revision ID: a5c7e2b9d184
+Revises: f3a8c1d6e407
+Create Date: 2026-10-17 16:40:00.000000
+
+Indexes are built with CREATE INDEX CONCURRENTLY so the migration can run
+against a live database without blocking writes. That cannot happen inside
+a transaction, so each statement runs in an autocommit block. If a build
+fails it leaves an INVALID index behind: drop it and run the migration again.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c7e2b9d184'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c1d6e407'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # (name, table, columns, extra kwargs)
+    ('ix_tickets_created_by_id_created_at', 'tickets', ['created_by_id', 'created_at', 'id'], {}),
+    ('ix_tickets_assigned_team_id_created_at', 'tickets', ['assigned_team_id', 'created_at', 'id'], {}),
+    ('ix_tickets_status_created_at', 'tickets', ['status', 'created_at', 'id'], {}),
+    ('ix_tickets_created_at', 'tickets', ['created_at', 'id'], {}),
+    ('ix_tickets_priority_created_at', 'tickets', ['priority', 'created_at', 'id'], {}),
+    ('ix_notifications_recipient_id_created_at', 'notifications', ['recipient_id', 'created_at'], {}),
+    ('ix_comments_ticket_id_created_at', 'comments', ['ticket_id', 'created_at'], {}),
+    ('ix_ticket_documents_ticket_id', 'ticket_documents', ['ticket_id'], {}),
+    ('ix_users_role', 'users', ['role'], {}),
+    ('ix_users_team_id', 'users', ['team_id'], {'postgresql_where': sa.text('team_id IS NOT NULL')}),
+]
+
+
+def upgrade() -> None:
+    """Add composite and partial indexes for the hot query patterns."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs
+            )
+
+
+def downgrade() -> None:
+    """Drop the hot query indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,55 @@
+"""track ticket change xids
+
+Revision ID: a9c4e7f2b316
+Revises: f6b2d9e4a813
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e7f2b316'
+down_revision: Union[str, Sequence[str], None] = 'f6b2d9e4a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CURRENT_XID = 'pg_current_xact_id()::text::bigint'
+
+
+def upgrade() -> None:
+    """Record the transaction that last changed each ticket, and order the change feed by it."""
+    # Existing tickets count as changed by this migration
+    op.add_column('tickets', sa.Column('change_xid', sa.BigInteger(), nullable=True))
+    op.execute(f'UPDATE tickets SET change_xid = {CURRENT_XID}')
+    op.alter_column('tickets', 'change_xid', nullable=False, server_default=sa.text(CURRENT_XID))
+
+    # Every update counts, including the ones triggers make for history, documents and comments
+    op.execute(f"""
+        CREATE FUNCTION tickets_change_xid_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := {CURRENT_XID};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tickets_change_xid_update
+        BEFORE UPDATE ON tickets
+        FOR EACH ROW EXECUTE FUNCTION tickets_change_xid_update()
+    """)
+
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
+    op.create_index('ix_tickets_change_xid', 'tickets', ['change_xid', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Order the change feed by updated_at again."""
+    op.drop_index('ix_tickets_change_xid', table_name='tickets')
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at', 'id'], unique=False)
+    op.execute('DROP TRIGGER tickets_change_xid_update ON tickets')
+    op.execute('DROP FUNCTION tickets_change_xid_update()')
+    op.drop_column('tickets', 'change_xid')
@@ -0,0 +1,95 @@
+"""add ticket search
+
+Revision ID: b8d3f5a1c627
+Revises: a5c7e2b9d184
+Create Date: 2026-10-17 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3f5a1c627'
+down_revision: Union[str, Sequence[str], None] = 'a5c7e2b9d184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a trigger-maintained tsvector and trigram index for ticket search."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('tickets', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Title weighs most, then description, resolution notes and comments
+    op.execute("""
+        CREATE FUNCTION ticket_search_document(p_ticket_id integer, p_title text, p_description text, p_notes text)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(p_description, '')), 'B')
+                || setweight(to_tsvector('english', coalesce(p_notes, '')), 'C')
+                || setweight(to_tsvector('english', coalesce(
+                       (SELECT string_agg(content, ' ') FROM comments WHERE ticket_id = p_ticket_id), '')), 'D')
+        $$ LANGUAGE sql STABLE
+    """)
+    op.execute("""
+        CREATE FUNCTION tickets_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := ticket_search_document(NEW.id, NEW.title, NEW.description, NEW.resolution_notes);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tickets_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description, resolution_notes ON tickets
+        FOR EACH ROW EXECUTE FUNCTION tickets_search_vector_update()
+    """)
+    op.execute("""
+        CREATE FUNCTION comments_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE tickets
+                SET search_vector = ticket_search_document(id, title, description, resolution_notes)
+                WHERE id = OLD.ticket_id;
+            END IF;
+            IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.ticket_id <> OLD.ticket_id) THEN
+                UPDATE tickets
+                SET search_vector = ticket_search_document(id, title, description, resolution_notes)
+                WHERE id = NEW.ticket_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER comments_search_vector_update
+        AFTER INSERT OR UPDATE OF content, ticket_id OR DELETE ON comments
+        FOR EACH ROW EXECUTE FUNCTION comments_search_vector_update()
+    """)
+
+    op.execute("UPDATE tickets SET search_vector = ticket_search_document(id, title, description, resolution_notes)")
+
+    op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_tickets_title_trgm', 'tickets', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+    # Replaced by the trigram index, which also serves LIKE/ILIKE
+    op.drop_index('ix_tickets_title', table_name='tickets')
+
+
+def downgrade() -> None:
+    """Remove ticket search."""
+    op.create_index('ix_tickets_title', 'tickets', ['title'], unique=False)
+    op.drop_index('ix_tickets_title_trgm', table_name='tickets')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.execute('DROP TRIGGER comments_search_vector_update ON comments')
+    op.execute('DROP FUNCTION comments_search_vector_update()')
+    op.execute('DROP TRIGGER tickets_search_vector_update ON tickets')
+    op.execute('DROP FUNCTION tickets_search_vector_update()')
+    op.execute('DROP FUNCTION ticket_search_document(integer, text, text, text)')
+    op.drop_column('tickets', 'search_vector')
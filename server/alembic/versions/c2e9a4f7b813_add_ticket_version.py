@@ -0,0 +1,29 @@
+"""add ticket version
+
+Revision ID: c2e9a4f7b813
+Revises: b8d3f5a1c627
+Create Date: 2026-10-17 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e9a4f7b813'
+down_revision: Union[str, Sequence[str], None] = 'b8d3f5a1c627'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the version counter used for optimistic concurrency on tickets."""
+    # A constant default does not rewrite the table
+    op.add_column('tickets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Remove the ticket version counter."""
+    op.drop_column('tickets', 'version')
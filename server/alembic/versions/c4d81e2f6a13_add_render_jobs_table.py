@@ -0,0 +1,58 @@
+"""add render jobs table
+
+Revision ID: c4d81e2f6a13
+Revises: 10a2fdac70e7
+Create Date: 2026-10-17 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81e2f6a13'
+down_revision: Union[str, Sequence[str], None] = '10a2fdac70e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the PDF render job queue."""
+    op.create_table('render_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('template_name', sa.String(), nullable=False),
+    sa.Column('landscape', sa.Boolean(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('cache_key', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'DONE', 'FAILED', name='renderjobstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('worker', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['ticket_documents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_render_jobs_id'), 'render_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_render_jobs_job_id'), 'render_jobs', ['job_id'], unique=True)
+    # Workers only ever scan the pending part of the queue
+    op.create_index(
+        'ix_render_jobs_pending', 'render_jobs', ['run_after', 'id'], unique=False,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')")
+    )
+
+
+def downgrade() -> None:
+    """Drop the PDF render job queue."""
+    op.drop_index('ix_render_jobs_pending', table_name='render_jobs')
+    op.drop_index(op.f('ix_render_jobs_job_id'), table_name='render_jobs')
+    op.drop_index(op.f('ix_render_jobs_id'), table_name='render_jobs')
+    op.drop_table('render_jobs')
+    sa.Enum(name='renderjobstatus').drop(op.get_bind(), checkfirst=True)
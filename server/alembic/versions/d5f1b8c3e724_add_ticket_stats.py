@@ -0,0 +1,44 @@
+"""add ticket stats
+
+Revision ID: d5f1b8c3e724
+Revises: c2e9a4f7b813
+Create Date: 2026-10-17 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1b8c3e724'
+down_revision: Union[str, Sequence[str], None] = 'c2e9a4f7b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the per (status, priority, team) ticket counters and fill them."""
+    op.create_table(
+        'ticket_stats',
+        sa.Column('status', postgresql.ENUM(name='ticketstatus', create_type=False), nullable=False),
+        sa.Column('priority', postgresql.ENUM(name='ticketpriority', create_type=False), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('status', 'priority', 'team_id')
+    )
+    # team_id 0 counts unallocated tickets
+    op.execute("""
+        INSERT INTO ticket_stats (status, priority, team_id, count)
+        SELECT status, priority, coalesce(assigned_team_id, 0), count(*)
+        FROM tickets
+        WHERE status IS NOT NULL AND priority IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Drop the ticket counters."""
+    op.drop_table('ticket_stats')
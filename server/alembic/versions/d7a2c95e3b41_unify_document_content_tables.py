@@ -0,0 +1,82 @@
+"""unify document content tables
+
+Revision ID: d7a2c95e3b41
+Revises: c4d81e2f6a13
+Create Date: 2026-10-17 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c95e3b41'
+down_revision: Union[str, Sequence[str], None] = 'c4d81e2f6a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Per-type content tables replaced by document_contents, with their document_type
+LEGACY_TABLES = {
+    'voucher_contents': 'voucher',
+    'outbound_delivery_contents': 'outbound_delivery',
+    'voucher_variable_qty_contents': 'voucher_variable_qty',
+    'voucher_with_title_contents': 'voucher_title',
+    'voucher_with_explanation_contents': 'voucher_explanation',
+    'completion_certificate_contents': 'completion_certificate',
+}
+
+
+def upgrade() -> None:
+    """Move every per-type content row into a single document_contents table."""
+    op.create_table('document_contents',
+    sa.Column('document_id', sa.Integer(), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['ticket_documents.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ),
+    sa.PrimaryKeyConstraint('document_id')
+    )
+    op.create_index(op.f('ix_document_contents_ticket_id'), 'document_contents', ['ticket_id'], unique=False)
+
+    for table in LEGACY_TABLES:
+        # Keep the newest row should a document ever have been stored twice
+        op.execute(f"""
+            INSERT INTO document_contents (document_id, ticket_id, data, created_at)
+            SELECT DISTINCT ON (document_id) document_id, ticket_id, data, created_at
+            FROM {table}
+            ORDER BY document_id, id DESC
+            ON CONFLICT (document_id) DO NOTHING
+        """)
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+        op.drop_table(table)
+
+
+def downgrade() -> None:
+    """Split document_contents back into the per-type content tables."""
+    for table, document_type in LEGACY_TABLES.items():
+        op.create_table(table,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('ticket_id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['ticket_documents.id'], ),
+        sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+        op.execute(f"""
+            INSERT INTO {table} (ticket_id, document_id, data, created_at)
+            SELECT c.ticket_id, c.document_id, c.data, c.created_at
+            FROM document_contents c
+            JOIN ticket_documents d ON d.id = c.document_id
+            WHERE d.document_type = '{document_type}'
+            ORDER BY c.document_id
+        """)
+
+    op.drop_index(op.f('ix_document_contents_ticket_id'), table_name='document_contents')
+    op.drop_table('document_contents')
@@ -0,0 +1,94 @@
+"""add ticket metrics
+
+Revision ID: e8a3c6d2f945
+Revises: d5f1b8c3e724
+Create Date: 2026-10-17 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3c6d2f945'
+down_revision: Union[str, Sequence[str], None] = 'd5f1b8c3e724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add per-ticket lifecycle metrics and compute them from ticket_events."""
+    op.create_table(
+        'ticket_metrics',
+        sa.Column('ticket_id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=True),
+        sa.Column('priority', postgresql.ENUM(name='ticketpriority', create_type=False), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('state', postgresql.ENUM(name='ticketstatus', create_type=False), nullable=False),
+        sa.Column('state_since', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('allocate_seconds', sa.Integer(), nullable=True),
+        sa.Column('resolve_seconds', sa.Integer(), nullable=True),
+        sa.Column('reopen_count', sa.Integer(), nullable=False),
+        sa.Column('open_seconds', sa.Integer(), nullable=False),
+        sa.Column('allocated_seconds', sa.Integer(), nullable=False),
+        sa.Column('resolved_seconds', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ticket_id')
+    )
+
+    # Replay each ticket's status events once: every event starts a span in
+    # a state that lasts until the next one. Spans are rounded to seconds one
+    # at a time, as the live updates do.
+    op.execute("""
+        WITH events AS (
+            SELECT ticket_id, event, team_id, ts,
+                   CASE event
+                       WHEN 'CREATED' THEN 'OPEN'
+                       WHEN 'REALLOCATED_TO_G1' THEN 'OPEN'
+                       WHEN 'ALLOCATED' THEN 'ALLOCATED'
+                       WHEN 'REALLOCATED_TO_SAME_TEAM' THEN 'ALLOCATED'
+                       WHEN 'MARKED_FOR_REVIEW' THEN 'RESOLVED'
+                       WHEN 'APPROVED_AND_CLOSED' THEN 'CLOSED'
+                   END AS state,
+                   lead(ts) OVER (PARTITION BY ticket_id ORDER BY ts, id) AS until
+            FROM ticket_events
+            WHERE event IN ('CREATED', 'REALLOCATED_TO_G1', 'ALLOCATED', 'REALLOCATED_TO_SAME_TEAM',
+                            'MARKED_FOR_REVIEW', 'APPROVED_AND_CLOSED')
+        )
+        INSERT INTO ticket_metrics (
+            ticket_id, team_id, priority, created_at, state, state_since,
+            allocate_seconds, resolve_seconds, reopen_count,
+            open_seconds, allocated_seconds, resolved_seconds
+        )
+        SELECT
+            t.id,
+            coalesce(t.assigned_team_id, (array_agg(e.team_id ORDER BY e.ts DESC) FILTER (WHERE e.team_id IS NOT NULL))[1]),
+            coalesce(t.priority, 'MEDIUM'),
+            coalesce(t.created_at, now()),
+            coalesce(t.status, 'OPEN'),
+            coalesce(max(e.ts) FILTER (WHERE e.until IS NULL), t.created_at, now()),
+            extract(epoch FROM min(e.ts) FILTER (WHERE e.event = 'ALLOCATED') - t.created_at)::integer,
+            CASE WHEN t.status = 'CLOSED'
+                 THEN extract(epoch FROM max(e.ts) FILTER (WHERE e.event = 'APPROVED_AND_CLOSED') - t.created_at)::integer
+            END,
+            count(*) FILTER (WHERE e.event IN ('REALLOCATED_TO_G1', 'REALLOCATED_TO_SAME_TEAM')),
+            coalesce(sum(extract(epoch FROM e.until - e.ts)::integer) FILTER (WHERE e.state = 'OPEN'), 0),
+            coalesce(sum(extract(epoch FROM e.until - e.ts)::integer) FILTER (WHERE e.state = 'ALLOCATED'), 0),
+            coalesce(sum(extract(epoch FROM e.until - e.ts)::integer) FILTER (WHERE e.state = 'RESOLVED'), 0)
+        FROM tickets t
+        LEFT JOIN events e ON e.ticket_id = t.id
+        GROUP BY t.id
+    """)
+
+    op.create_index('ix_ticket_metrics_created_at', 'ticket_metrics', ['created_at'], unique=False)
+    op.create_index('ix_ticket_metrics_team_id_created_at', 'ticket_metrics', ['team_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the ticket metrics."""
+    op.drop_index('ix_ticket_metrics_team_id_created_at', table_name='ticket_metrics')
+    op.drop_index('ix_ticket_metrics_created_at', table_name='ticket_metrics')
+    op.drop_table('ticket_metrics')
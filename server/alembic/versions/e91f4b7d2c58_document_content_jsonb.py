@@ -0,0 +1,42 @@
+"""document content jsonb
+
+Revision ID: e91f4b7d2c58
+Revises: d7a2c95e3b41
+Create Date: 2026-10-17 13:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91f4b7d2c58'
+down_revision: Union[str, Sequence[str], None] = 'd7a2c95e3b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store document content as JSONB with a GIN index for containment search."""
+    op.alter_column(
+        'document_contents', 'data',
+        type_=postgresql.JSONB(), existing_type=sa.JSON(), existing_nullable=False,
+        postgresql_using='data::jsonb'
+    )
+    op.create_index(
+        'ix_document_contents_data', 'document_contents', ['data'], unique=False,
+        postgresql_using='gin', postgresql_ops={'data': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Revert document content to plain JSON."""
+    op.drop_index('ix_document_contents_data', table_name='document_contents')
+    op.alter_column(
+        'document_contents', 'data',
+        type_=sa.JSON(), existing_type=postgresql.JSONB(), existing_nullable=False,
+        postgresql_using='data::json'
+    )
@@ -0,0 +1,79 @@
+"""add ticket events table
+
+Revision ID: f3a8c1d6e407
+Revises: e91f4b7d2c58
+Create Date: 2026-10-17 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c1d6e407'
+down_revision: Union[str, Sequence[str], None] = 'e91f4b7d2c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Move ticket history from the JSON column into ticket_events."""
+    op.create_table('ticket_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('event', sa.String(), nullable=False),
+    sa.Column('actor', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('team_name', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('ts', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # History timestamps were naive UTC isoformat strings; keep entry order
+    op.execute("""
+        INSERT INTO ticket_events (ticket_id, event, actor, role, team_id, team_name, notes, ts)
+        SELECT t.id,
+               COALESCE(h.entry->>'event', 'UNKNOWN'),
+               COALESCE(h.entry->>'actor', ''),
+               COALESCE(h.entry->>'role', ''),
+               (h.entry->>'team_id')::integer,
+               h.entry->>'team_name',
+               h.entry->>'notes',
+               COALESCE((h.entry->>'timestamp')::timestamp AT TIME ZONE 'UTC', t.created_at, now())
+        FROM tickets t
+        CROSS JOIN LATERAL json_array_elements(t.history) WITH ORDINALITY AS h(entry, position)
+        WHERE t.history IS NOT NULL AND json_typeof(t.history) = 'array'
+        ORDER BY t.id, h.position
+    """)
+
+    op.create_index('ix_ticket_events_ticket_id_ts', 'ticket_events', ['ticket_id', 'ts'], unique=False)
+    op.create_index('ix_ticket_events_actor_ts', 'ticket_events', ['actor', 'ts'], unique=False)
+    op.drop_column('tickets', 'history')
+
+
+def downgrade() -> None:
+    """Rebuild the history JSON column from ticket_events."""
+    op.add_column('tickets', sa.Column('history', sa.JSON(), nullable=True, server_default='[]'))
+    op.execute("""
+        UPDATE tickets t
+        SET history = e.history
+        FROM (
+            SELECT ticket_id,
+                   json_agg(json_build_object(
+                       'event', event, 'actor', actor, 'role', role,
+                       'team_id', team_id, 'team_name', team_name, 'notes', notes,
+                       'timestamp', to_char(ts AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                   ) ORDER BY ts, id) AS history
+            FROM ticket_events
+            GROUP BY ticket_id
+        ) e
+        WHERE t.id = e.ticket_id
+    """)
+    op.drop_index('ix_ticket_events_actor_ts', table_name='ticket_events')
+    op.drop_index('ix_ticket_events_ticket_id_ts', table_name='ticket_events')
+    op.drop_table('ticket_events')
@@ -0,0 +1,61 @@
+"""track ticket changes
+
+Revision ID: f6b2d9e4a813
+Revises: e8a3c6d2f945
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b2d9e4a813'
+down_revision: Union[str, Sequence[str], None] = 'e8a3c6d2f945'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keep tickets.updated_at current with history and documents, and index it."""
+    op.execute("""
+        UPDATE tickets t SET updated_at = greatest(
+            coalesce(t.updated_at, t.created_at),
+            (SELECT max(ts) FROM ticket_events WHERE ticket_id = t.id),
+            (SELECT max(created_at) FROM ticket_documents WHERE ticket_id = t.id)
+        )
+    """)
+    op.alter_column('tickets', 'updated_at', nullable=False, server_default=sa.text('now()'))
+
+    # One statement-level trigger per table, so a bulk insert touches each ticket
+    # once. A ticket this transaction already updated (updated_at = now()) is left
+    # alone; otherwise the wall clock time is newer than any committed value.
+    op.execute("""
+        CREATE FUNCTION tickets_touch_from_children() RETURNS trigger AS $$
+        BEGIN
+            UPDATE tickets SET updated_at = clock_timestamp()
+            WHERE id IN (SELECT ticket_id FROM new_rows) AND updated_at <> now();
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('ticket_events', 'ticket_documents'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_touch_ticket
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION tickets_touch_from_children()
+        """)
+
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Stop tracking ticket changes."""
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
+    for table in ('ticket_events', 'ticket_documents'):
+        op.execute(f'DROP TRIGGER {table}_touch_ticket ON {table}')
+    op.execute('DROP FUNCTION tickets_touch_from_children()')
+    op.alter_column('tickets', 'updated_at', nullable=True, server_default=None)
@@ -1,12 +1,14 @@
 from typing import List, Any
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app import deps
-from app.models.user import User as UserModel
+from app.models.user import User as UserModel, UserRole
 from app.models.ticket import Ticket as TicketModel
 from app.models.comment import Comment
+from app.services.tickets.notifications import notify_users
 
 router = APIRouter()
 
@@ -70,47 +72,18 @@ def create_comment(
         notes=content[:100] + ("..." if len(content) > 100 else "")
     )
     
+    # Notify everyone who can see the ticket, except the commenter
+    audience = [UserModel.role == UserRole.G1, UserModel.id == ticket.created_by_id]
+    if ticket.assigned_team_id:
+        audience.append(UserModel.team_id == ticket.assigned_team_id)
+    notify_users(db, [(
+        and_(or_(*audience), UserModel.id != current_user.id),
+        f"{current_user.full_name} added a comment on ticket '{ticket.title}'",
+    )], ticket.id)
+
     db.commit()
     db.refresh(new_comment)
 
-    # Notify all users that can access the ticket
-    try:
-        from app.models.notification import Notification
-        from app.models.user import UserRole, User as UserModel
-        
-        recipients = set()
-        
-        # 1. G1 users
-        g1_users = db.query(UserModel).filter(UserModel.role == UserRole.G1).all()
-        for g1 in g1_users:
-            recipients.add(g1.id)
-            
-        # 2. Ticket creator
-        if ticket.created_by_id:
-            recipients.add(ticket.created_by_id)
-            
-        # 3. Assigned team members
-        if ticket.assigned_team_id:
-            team_members = db.query(UserModel).filter(UserModel.team_id == ticket.assigned_team_id).all()
-            for member in team_members:
-                recipients.add(member.id)
-                
-        # Remove the commenter from recipients
-        if current_user.id in recipients:
-            recipients.remove(current_user.id)
-            
-        # Create notifications
-        for r_id in recipients:
-            db.add(Notification(
-                recipient_id=r_id,
-                ticket_id=ticket.id,
-                message=f"{current_user.full_name} added a comment on ticket '{ticket.title}'"
-            ))
-        db.commit()
-    except Exception as e:
-        print(f"Error creating comment notifications: {e}")
-        db.rollback()
-    
     return {
         "id": new_comment.id,
         "content": new_comment.content,
@@ -1,64 +1,82 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from app.api.deps import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from app.api.deps import get_db, get_current_active_user
+from app.models.user import User, UserRole
 from app.models.document import TicketDocument
-from app.models.document_content import (
-    VoucherContent, OutboundDeliveryContent, 
-    VoucherVariableQtyContent, VoucherWithTitleContent, 
-    VoucherWithExplanationContent, CompletionCertificateContent
-)
-from app.services.documents.html_generator import generate_html
-from app.services.documents.pdf_generator import html_to_pdf
+from app.models.document_content import DocumentContent
+from app.models.ticket import Ticket
+from app.models.render_job import RenderJob, RenderJobStatus
+from app.services.documents.registry import get_document_type
+from app.services.documents.rendering import render_document, document_cache_key, document_last_modified, is_landscape
+from app.services.documents.archive import archive_entries, stream_archive
+from app.services.documents.search import content_filters
+from app.services.documents.preview import preview_key, render_preview
+from app.services.tickets.access import scope_tickets
+from app.services.render_jobs.jobs import submit_job, queue_depth
+from app.services.documents.browser_pool import browser_pool
+from app.services.documents.pdf_cache import pdf_cache
+from app.utils.http_cache import quote_etag, etag_matches, http_date, not_modified_since
 from app.schemas.document import (
     VoucherRequest, DocumentResponse, 
     OutboundDeliveryRequest, VoucherVariableQtyRequest,
-    VoucherTitleRequest, VoucherExplanationRequest
+    VoucherTitleRequest, VoucherExplanationRequest,
+    RenderJobResponse, DocumentSearchResult
 )
 import uuid
-import os
 import logging
-from typing import Any, Type
+from datetime import datetime
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Use absolute path for temp directory to ensure consistency across environments
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-TEMP_DIR = os.path.join(BASE_DIR, "temp")
+
+def load_document(db: Session, file_id: str):
+    """Fetch a document's metadata and structured content in a single joined query."""
+    db_doc = (
+        db.query(TicketDocument)
+        .options(joinedload(TicketDocument.content))
+        .filter(TicketDocument.file_id == file_id)
+        .first()
+    )
+    if not db_doc:
+        raise HTTPException(status_code=404, detail="Document record not found")
+
+    if not get_document_type(db_doc.document_type):
+        raise HTTPException(status_code=400, detail=f"Unsupported document type: {db_doc.document_type}")
+
+    if not db_doc.content:
+        raise HTTPException(status_code=404, detail="Document content not found")
+
+    return db_doc, db_doc.content
+
+
+def add_document(document_type: str, ticket_id: int, data: dict, db: Session) -> str:
+    """Queue document metadata and content on the session without committing; returns the file id."""
+    doc_type = get_document_type(document_type)
+    file_id = str(uuid.uuid4())
+    # Store the Document metadata (Template & Type) together with its content
+    db.add(TicketDocument(
+        ticket_id=ticket_id,
+        file_id=file_id,
+        template_name=doc_type.template_name,
+        document_type=document_type,
+        content=DocumentContent(ticket_id=ticket_id, data=data)
+    ))
+    return file_id
 
 
 def save_document_data(
-    template_name: str,
+    document_type: str,
     ticket_id: int,
     data: dict,
-    db: Session,
-    document_type: str,
-    content_model: Type[Any]
+    db: Session
 ) -> DocumentResponse:
     """Helper to save document metadata and structured content to DB."""
     try:
-        file_id = str(uuid.uuid4())
-        
-        # 1. Store the Document metadata (Template & Type)
-        db_doc = TicketDocument(
-            ticket_id=ticket_id,
-            file_id=file_id,
-            template_name=template_name,
-            document_type=document_type
-        )
-        db.add(db_doc)
-        db.flush() # Get the ID for the content association
-
-        # 2. Store the structured content data
-        content_row = content_model(
-            ticket_id=ticket_id,
-            document_id=db_doc.id,
-            data=data
-        )
-        db.add(content_row)
-
+        file_id = add_document(document_type, ticket_id, data, db)
         db.commit()
         return DocumentResponse(file_id=file_id, file=f"/api/v1/documents/download/{file_id}")
 
@@ -71,154 +89,252 @@ def save_document_data(
 @router.post("/voucher", response_model=DocumentResponse)
 def generate_voucher(data: VoucherRequest, db: Session = Depends(get_db)):
     """Store data for a Receipt, Issue and Expense Voucher."""
-    return save_document_data(
-        template_name="voucher.html",
-        ticket_id=data.ticket_id,
-        data=data.model_dump(),
-        db=db,
-        document_type="voucher",
-        content_model=VoucherContent
-    )
+    return save_document_data("voucher", data.ticket_id, data.model_dump(), db)
 
 
 @router.post("/outbound-delivery", response_model=DocumentResponse)
 def generate_outbound_delivery(data: OutboundDeliveryRequest, db: Session = Depends(get_db)):
     """Store data for Outbound Delivery."""
-    return save_document_data(
-        template_name="outbound_delivery.html",
-        ticket_id=data.ticket_id,
-        data=data.model_dump(),
-        db=db,
-        document_type="outbound_delivery",
-        content_model=OutboundDeliveryContent
-    )
+    return save_document_data("outbound_delivery", data.ticket_id, data.model_dump(), db)
 
 
 @router.post("/voucher-variable-qty", response_model=DocumentResponse)
 def generate_voucher_variable_qty(data: VoucherVariableQtyRequest, db: Session = Depends(get_db)):
     """Store data for Voucher with Variable Qty."""
-    return save_document_data(
-        template_name="voucher_with_variable_qty.html",
-        ticket_id=data.ticket_id,
-        data=data.model_dump(),
-        db=db,
-        document_type="voucher_variable_qty",
-        content_model=VoucherVariableQtyContent
-    )
+    return save_document_data("voucher_variable_qty", data.ticket_id, data.model_dump(), db)
 
 
 @router.post("/voucher-title", response_model=DocumentResponse)
 def generate_voucher_title(data: VoucherTitleRequest, db: Session = Depends(get_db)):
     """Store data for Voucher with Title."""
-    return save_document_data(
-        template_name="vouhcer_with_title.html",
-        ticket_id=data.ticket_id,
-        data=data.model_dump(),
-        db=db,
-        document_type="voucher_title",
-        content_model=VoucherWithTitleContent
-    )
+    return save_document_data("voucher_title", data.ticket_id, data.model_dump(), db)
 
 
 @router.post("/voucher-explanation", response_model=DocumentResponse)
 def generate_voucher_explanation(data: VoucherExplanationRequest, db: Session = Depends(get_db)):
     """Store data for Voucher with Explanation."""
-    return save_document_data(
-        template_name="voucher_with_explanation.html",
-        ticket_id=data.ticket_id,
-        data=data.model_dump(),
-        db=db,
-        document_type="voucher_explanation",
-        content_model=VoucherWithExplanationContent
-    )
+    return save_document_data("voucher_explanation", data.ticket_id, data.model_dump(), db)
 
 
 @router.get("/download/{file_id}")
-def download_document(file_id: str, db: Session = Depends(get_db)):
+def download_document(file_id: str, request: Request, db: Session = Depends(get_db)):
     """
-    Generate the PDF on-the-fly and stream it to the user.
+    Stream the PDF for a document, rendering it on-the-fly on a cache miss.
     Fetches template and data from database.
     """
-    # 1. Fetch document metadata
-    db_doc = db.query(TicketDocument).filter(TicketDocument.file_id == file_id).first()
-    if not db_doc:
-        raise HTTPException(status_code=404, detail="Document record not found")
-
-    # 2. Identify and fetch content from the correct content table
-    CONTENT_MAP = {
-        "voucher": VoucherContent,
-        "outbound_delivery": OutboundDeliveryContent,
-        "voucher_variable_qty": VoucherVariableQtyContent,
-        "voucher_title": VoucherWithTitleContent,
-        "voucher_explanation": VoucherWithExplanationContent,
-        "completion_certificate": CompletionCertificateContent
+    db_doc, content_row = load_document(db, file_id)
+
+    # Revalidate against the content hash and modification time before doing any rendering
+    landscape = is_landscape(db_doc.document_type)
+    key = document_cache_key(db_doc.template_name, content_row.data, landscape)
+    last_modified = document_last_modified(db_doc.template_name, content_row.updated_at or content_row.created_at)
+    headers = {
+        "ETag": quote_etag(key),
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": "private, no-cache",
     }
-    
-    content_model = CONTENT_MAP.get(db_doc.document_type)
-    if not content_model:
-        raise HTTPException(status_code=400, detail=f"Unsupported document type: {db_doc.document_type}")
-        
-    content_row = db.query(content_model).filter(content_model.document_id == db_doc.id).first()
-    if not content_row:
-        raise HTTPException(status_code=404, detail="Document content not found")
-
-    # 3. Generate PDF on-the-fly
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    elif not_modified_since(request.headers.get("if-modified-since"), last_modified):
+        return Response(status_code=304, headers=headers)
+
+    # Serve from the PDF cache, rendering once in memory on a miss
     try:
-        os.makedirs(TEMP_DIR, exist_ok=True)
-        temp_id = str(uuid.uuid4())
-        html_path = os.path.join(TEMP_DIR, f"{temp_id}.html")
-        pdf_path = os.path.join(TEMP_DIR, f"{temp_id}.pdf")
+        pdf_bytes = render_document(db_doc.template_name, content_row.data, landscape, key=key)
+    except Exception as e:
+        logger.exception("On-demand PDF generation failed")
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
 
-        generate_html(db_doc.template_name, content_row.data, html_path)
-        
-        landscape = db_doc.document_type == "outbound_delivery"
-        html_to_pdf(html_path, pdf_path, landscape=landscape)
+    headers["Content-Disposition"] = f'inline; filename="{db_doc.document_type}_{file_id}.pdf"'
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+
+@router.get("/search", response_model=List[DocumentSearchResult])
+def search_documents(
+    part_no: Optional[str] = None,
+    sap_number: Optional[str] = None,
+    batch_no: Optional[str] = None,
+    serial_no: Optional[str] = None,
+    shipment_no: Optional[str] = None,
+    document_type: Optional[str] = None,
+    limit: int = Query(100, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Find documents (and their tickets) by exact part number, SAP number,
+    batch, serial or shipment number. Only tickets visible to the caller
+    are searched.
+    """
+    filters = content_filters(
+        part_no=part_no, sap_number=sap_number, batch_no=batch_no,
+        serial_no=serial_no, shipment_no=shipment_no
+    )
+    if not filters:
+        raise HTTPException(status_code=400, detail="At least one search field is required")
 
-        # 4. Stream and cleanup
-        from starlette.background import BackgroundTasks
-        background_tasks = BackgroundTasks()
-        
-        def cleanup_temp_files():
-            try:
-                if os.path.exists(html_path): os.remove(html_path)
-                if os.path.exists(pdf_path): os.remove(pdf_path)
-            except Exception as e:
-                logger.error(f"Failed to cleanup temp files: {e}")
-
-        background_tasks.add_task(cleanup_temp_files)
-
-        return FileResponse(
-            path=pdf_path,
-            media_type="application/pdf",
-            filename=f"{db_doc.document_type}_{file_id}.pdf",
-            background=background_tasks,
-            content_disposition_type="inline"
+    query = (
+        db.query(
+            TicketDocument.file_id, TicketDocument.document_type, TicketDocument.created_at,
+            Ticket.id.label("ticket_id"), Ticket.title.label("ticket_title"), Ticket.status.label("ticket_status")
+        )
+        .join(DocumentContent, DocumentContent.document_id == TicketDocument.id)
+        .join(Ticket, Ticket.id == TicketDocument.ticket_id)
+        .filter(*filters)
+    )
+    if document_type:
+        query = query.filter(TicketDocument.document_type == document_type)
+    query = scope_tickets(query, current_user)
+    if query is None:
+        return []
+
+    return query.order_by(TicketDocument.created_at.desc(), TicketDocument.id.desc()).limit(limit).all()
+
+
+@router.get("/export")
+def export_documents(
+    ticket_ids: Optional[List[int]] = Query(None),
+    document_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Stream a ZIP of rendered PDFs for every document matching the filters
+    (G1/Admin only). PDFs are rendered concurrently and written to the
+    response as they finish.
+    """
+    if current_user.role not in (UserRole.G1, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not (ticket_ids or document_type or created_from or created_to):
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+    query = db.query(TicketDocument)
+    if ticket_ids:
+        query = query.filter(TicketDocument.ticket_id.in_(ticket_ids))
+    if document_type:
+        query = query.filter(TicketDocument.document_type == document_type)
+    if created_from:
+        query = query.filter(TicketDocument.created_at >= created_from)
+    if created_to:
+        query = query.filter(TicketDocument.created_at < created_to)
+    entries = archive_entries(
+        query.join(DocumentContent, DocumentContent.document_id == TicketDocument.id)
+        .with_entities(
+            TicketDocument.ticket_id, TicketDocument.file_id, TicketDocument.document_type,
+            TicketDocument.template_name, DocumentContent.data
         )
+        .order_by(TicketDocument.ticket_id, TicketDocument.id)
+        .statement
+    )
+    if entries is None:
+        raise HTTPException(status_code=404, detail="No documents match the filters")
+
+    return StreamingResponse(
+        stream_archive(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="documents_{datetime.utcnow():%Y%m%d_%H%M%S}.zip"'},
+    )
+
+
+@router.get("/renderer/stats")
+def get_renderer_stats():
+    """Browser pool utilisation (busy/idle browsers, queue wait) and PDF cache size."""
+    return {"browser_pool": browser_pool.stats(), "pdf_cache": pdf_cache.stats()}
+
+
+@router.get("/preview/{file_id}", response_class=HTMLResponse)
+def preview_document(file_id: str, request: Request, db: Session = Depends(get_db)):
+    """Render a stored document as HTML, without going through the browser."""
+    db_doc, content_row = load_document(db, file_id)
+
+    key = preview_key(db_doc.template_name, content_row.data)
+    headers = {"ETag": quote_etag(key), "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
 
+    return HTMLResponse(render_preview(db_doc.template_name, content_row.data, key=key), headers=headers)
+
+
+@router.post("/preview/{file_id}", response_class=HTMLResponse)
+def preview_document_draft(file_id: str, payload: dict, db: Session = Depends(get_db)):
+    """Render unsaved edit-form data through the document's template."""
+    db_doc, _ = load_document(db, file_id)
+    try:
+        return HTMLResponse(render_preview(db_doc.template_name, payload))
     except Exception as e:
-        logger.exception("On-demand PDF generation failed")
+        raise HTTPException(status_code=400, detail=f"Failed to render preview: {str(e)}")
+
+
+@router.post("/jobs/{file_id}", response_model=RenderJobResponse, status_code=202)
+def submit_render_job(file_id: str, db: Session = Depends(get_db)):
+    """Queue a PDF render for a document and return the job to poll."""
+    db_doc, content_row = load_document(db, file_id)
+    job = submit_job(db, db_doc, content_row.data)
+    return _job_response(job, file_id)
+
+
+@router.get("/jobs/stats")
+def get_render_job_stats(db: Session = Depends(get_db)):
+    """Render queue depth (queued/running jobs and age of the oldest one)."""
+    return queue_depth(db)
+
+
+@router.get("/jobs/{job_id}", response_model=RenderJobResponse)
+def get_render_job(job_id: str, db: Session = Depends(get_db)):
+    """Current status of a render job."""
+    job = db.query(RenderJob).filter(RenderJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    return _job_response(job, job.document.file_id)
+
+
+@router.get("/jobs/{job_id}/result")
+def get_render_job_result(job_id: str, db: Session = Depends(get_db)):
+    """Download the PDF produced by a finished render job."""
+    job = db.query(RenderJob).filter(RenderJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    if job.status != RenderJobStatus.DONE:
+        raise HTTPException(status_code=409, detail=f"Render job is {job.status.value}")
+
+    # Re-render from the job snapshot if the cached PDF was evicted meanwhile
+    try:
+        pdf_bytes = render_document(job.template_name, job.payload, job.landscape, key=job.cache_key)
+    except Exception as e:
+        logger.exception("Render job result regeneration failed")
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
 
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "ETag": quote_etag(job.cache_key),
+            "Content-Disposition": f'inline; filename="{job.document.document_type}_{job.document.file_id}.pdf"',
+        },
+    )
+
+
+def _job_response(job: RenderJob, file_id: str) -> RenderJobResponse:
+    return RenderJobResponse(
+        job_id=job.job_id,
+        file_id=file_id,
+        status=job.status.value,
+        attempts=job.attempts,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=f"/api/v1/documents/jobs/{job.job_id}/result",
+    )
+
+
 @router.get("/content/{file_id}")
 def get_document_content(file_id: str, db: Session = Depends(get_db)):
     """Fetch the raw structured data for a document to populate edit forms."""
-    db_doc = db.query(TicketDocument).filter(TicketDocument.file_id == file_id).first()
-    if not db_doc:
-        raise HTTPException(status_code=404, detail="Document record not found")
-
-    CONTENT_MAP = {
-        "voucher": VoucherContent,
-        "outbound_delivery": OutboundDeliveryContent,
-        "voucher_variable_qty": VoucherVariableQtyContent,
-        "voucher_title": VoucherWithTitleContent,
-        "voucher_explanation": VoucherWithExplanationContent,
-        "completion_certificate": CompletionCertificateContent
-    }
-    
-    content_model = CONTENT_MAP.get(db_doc.document_type)
-    content_row = db.query(content_model).filter(content_model.document_id == db_doc.id).first()
-    if not content_row:
-        raise HTTPException(status_code=404, detail="Document content not found")
+    db_doc, content_row = load_document(db, file_id)
 
     return {
         "document_type": db_doc.document_type,
@@ -229,23 +345,10 @@ def get_document_content(file_id: str, db: Session = Depends(get_db)):
 @router.put("/{file_id}")
 def update_document_content(file_id: str, payload: dict, db: Session = Depends(get_db)):
     """Update existing document structured data."""
-    db_doc = db.query(TicketDocument).filter(TicketDocument.file_id == file_id).first()
-    if not db_doc:
-        raise HTTPException(status_code=404, detail="Document record not found")
+    db_doc, content_row = load_document(db, file_id)
 
-    CONTENT_MAP = {
-        "voucher": VoucherContent,
-        "outbound_delivery": OutboundDeliveryContent,
-        "voucher_variable_qty": VoucherVariableQtyContent,
-        "voucher_title": VoucherWithTitleContent,
-        "voucher_explanation": VoucherWithExplanationContent,
-        "completion_certificate": CompletionCertificateContent
-    }
-    
-    content_model = CONTENT_MAP.get(db_doc.document_type)
-    content_row = db.query(content_model).filter(content_model.document_id == db_doc.id).first()
-    if not content_row:
-        raise HTTPException(status_code=404, detail="Document content not found")
+    # Drop the stale rendering before the content changes
+    pdf_cache.discard(document_cache_key(db_doc.template_name, content_row.data, is_landscape(db_doc.document_type)))
 
     # Update the JSON data - payload is now the full model data from frontend
     content_row.data = payload
@@ -1,41 +1,275 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import datetime
+import io
+import logging
+import re
+from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import false
+from sqlalchemy.orm import Session, joinedload, subqueryload
 from app import deps
-from app.schemas.ticket import Ticket, TicketCreate, TicketUpdate, TicketAllocate, TicketResolve
-from app.models.ticket import Ticket as TicketModel, TicketStatus
+from app.schemas.ticket import Ticket, TicketPage, TicketChanges, TicketEvent, TicketSearchResult, TicketStats, TicketLifecycleStats, TicketImportReport, TicketCreate, TicketUpdate, TicketAllocate, TicketResolve
+from app.models.ticket import Ticket as TicketModel, TicketStatus, TicketPriority
+from app.models.ticket_event import TicketEvent as TicketEventModel
 from app.models.user import User as UserModel, UserRole
-from app.models.notification import Notification
-from app.models.team import Team as TeamModel
+from app.services.tickets.access import scope_tickets, can_view_ticket
+from app.services.tickets.analytics import GROUPS, PERIODS, lifecycle_report, start_metrics
+from app.services.tickets.changes import changes_since
+from app.services.tickets.bulk_import import FORMATS as IMPORT_FORMATS, import_tickets as run_import
+from app.services.tickets.export import FORMATS, stream_export
+from app.services.tickets.freshness import listing_validator, ticket_state, ticket_validator
+from app.services.tickets.fields import FIELD_COLUMNS, VIEWS, parse_fields, sparse_query, row_to_dict
+from app.services.tickets.loading import load_ticket, with_response_loading
+from app.services.tickets.notifications import notify_users
+from app.services.tickets.pagination import SORT_KEYS, InvalidCursor, paginate
+from app.services.tickets.search import search_tickets
+from app.services.tickets.stats import UNASSIGNED, bump_stats, read_stats, stat_key
+from app.services.tickets.transitions import InvalidTransition, StaleTicket, apply_transition
+from app.utils.http_cache import quote_etag, etag_matches, precondition_failed
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Ticket])
+# Responses are per user and must be revalidated before reuse
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def ticket_etag(ticket: TicketModel) -> str:
+    return quote_etag(ticket_validator(ticket), weak=True)
+
+
+def _version_tags(if_match: Optional[str]) -> Optional[str]:
+    """Cut ticket ETags down to ``ticket-{id}-v{version}``: comments and documents don't conflict."""
+    return if_match and re.sub(r'"(ticket-\d+-v\d+)-[^"]*"', r'"\1"', if_match)
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **CACHE_HEADERS})
+
+
+@router.get("/", response_model=Union[List[Ticket], List[Dict[str, Any]], TicketPage])
 def read_tickets(
+    *,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        None, description="Page with keyset pagination; pass an empty value for the first page"
+    ),
+    sort: str = Query("created", enum=list(SORT_KEYS)),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(FIELD_COLUMNS)}"
+    ),
+    view: str = Query("full", enum=list(VIEWS)),
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Retrieve tickets based on user role."""
-    query = db.query(TicketModel)
+    """
+    Retrieve tickets based on user role.
 
-    if current_user.role == UserRole.UNIT:
-        query = query.filter(TicketModel.created_by_id == current_user.id)
-    elif current_user.role == UserRole.TEAM:
-        if not current_user.team_id:
-            return []
-        query = query.filter(TicketModel.assigned_team_id == current_user.team_id)
-    elif current_user.role == UserRole.G1:
-        pass
+    Without ``cursor`` this returns a plain list paged by ``skip``/``limit``.
+    With ``cursor`` it returns ``{items, next_cursor}``, newest first by
+    ``sort``; pass ``next_cursor`` back to fetch the following page.
+
+    ``fields`` or ``view=summary`` return only those columns of each ticket,
+    without nested users, documents or history.
+
+    The ETag summarizes every ticket the listing could include; send it back
+    as If-None-Match to get 304 Not Modified while none of them changed.
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort order: {sort}")
+    try:
+        names = parse_fields(fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    listing = scope_tickets(db.query(TicketModel), current_user)
+    if listing is not None:
+        if status:
+            listing = listing.filter(TicketModel.status == status)
+        etag = quote_etag(listing_validator(listing, request.url.query), weak=True)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        response.headers.update({"ETag": etag, **CACHE_HEADERS})
+
+    if names is None:
+        query = db.query(TicketModel)
+    else:
+        # Cursors are built from the sort key columns, so select them too
+        keys = [column.key for column in SORT_KEYS[sort]] if cursor is not None else []
+        query = sparse_query(db, names, keys)
+
+    query = scope_tickets(query, current_user)
+    if query is None:
+        return [] if cursor is None else TicketPage(items=[])
 
     if status:
         query = query.filter(TicketModel.status == status)
+    if names is None:
+        query = with_response_loading(query)
+
+    next_cursor = None
+    if cursor is None:
+        rows = query.order_by(TicketModel.id).offset(skip).limit(limit).all()
+    else:
+        try:
+            rows, next_cursor = paginate(query, sort, cursor, limit)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if names is not None:
+        rows = [row_to_dict(row, names) for row in rows]
+    return rows if cursor is None else TicketPage(items=rows, next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=List[TicketSearchResult])
+def search(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Search ticket titles, descriptions, resolution notes and comments.
+    Falls back to prefix and fuzzy title matching when nothing matches exactly.
+    """
+    return search_tickets(db, current_user, q, limit)
+
 
-    tickets = query.offset(skip).limit(limit).all()
-    return tickets
+@router.get("/changes", response_model=TicketChanges)
+def read_ticket_changes(
+    db: Session = Depends(deps.get_db),
+    since: Optional[str] = Query(
+        None, description="Cursor from the previous poll; omit to start from the beginning"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Tickets created, updated, transitioned, commented on or given documents
+    since ``since``, within the caller's scope, oldest change first. Poll
+    again with the returned ``cursor``; ``has_more`` means more changes are
+    already waiting.
+    """
+    try:
+        items, cursor, has_more = changes_since(db, current_user, since, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TicketChanges(items=items, cursor=cursor, has_more=has_more)
+
+
+@router.get("/stats", response_model=TicketStats)
+def read_ticket_stats(
+    db: Session = Depends(deps.get_db),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Ticket counts per status, priority and team, for dashboards.
+    TEAM users get their own team's counts; UNIT users are not counted.
+    """
+    if current_user.role == UserRole.UNIT:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if current_user.role == UserRole.TEAM and not current_user.team_id:
+        return TicketStats(total=0, by_status={}, cells=[])
+
+    team_id = current_user.team_id if current_user.role == UserRole.TEAM else None
+    cells = read_stats(db, team_id)
+    by_status = {status: 0 for status in TicketStatus}
+    for cell in cells:
+        by_status[cell.status] += cell.count
+    return TicketStats(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        cells=[
+            {"status": cell.status, "priority": cell.priority, "count": cell.count,
+             "team_id": None if cell.team_id == UNASSIGNED else cell.team_id}
+            for cell in cells
+        ],
+    )
+
+
+@router.get("/analytics", response_model=List[TicketLifecycleStats])
+def read_ticket_analytics(
+    db: Session = Depends(deps.get_db),
+    group_by: str = Query("team", description=f"Comma-separated subset of: {', '.join(GROUPS)}"),
+    period: Optional[str] = Query(None, enum=list(PERIODS)),
+    since: Optional[datetime.datetime] = Query(None, description="Tickets created from; default 90 days ago"),
+    until: Optional[datetime.datetime] = Query(None, description="Tickets created before; default now"),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Lifecycle percentiles of tickets created in a time range, grouped by
+    team, priority and/or creation period. TEAM users get their own team.
+    """
+    if current_user.role == UserRole.UNIT:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if current_user.role == UserRole.TEAM and not current_user.team_id:
+        return []
+
+    until = until or datetime.datetime.now(datetime.timezone.utc)
+    since = since or until - datetime.timedelta(days=90)
+    team_id = current_user.team_id if current_user.role == UserRole.TEAM else None
+    names = [name.strip() for name in group_by.split(",") if name.strip()]
+    try:
+        return lifecycle_report(db, names, period, since, until, team_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+def export_tickets(
+    db: Session = Depends(deps.get_db),
+    format: str = Query("csv", enum=list(FORMATS)),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(FIELD_COLUMNS)}; default all"
+    ),
+    status: Optional[TicketStatus] = None,
+    team_id: Optional[int] = None,
+    priority: Optional[TicketPriority] = None,
+    created_from: Optional[datetime.datetime] = None,
+    created_to: Optional[datetime.datetime] = Query(None, description="Exclusive"),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Stream every ticket the user can see as CSV or NDJSON, oldest first.
+    Rows are read with a server-side cursor, so exports of any size use
+    constant memory.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format}")
+    try:
+        names = parse_fields(fields, "full") or list(FIELD_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = scope_tickets(sparse_query(db, names), current_user)
+    if query is None:
+        # Still a well-formed, empty export
+        query = sparse_query(db, names).filter(false())
+    if status:
+        query = query.filter(TicketModel.status == status)
+    if team_id is not None:
+        query = query.filter(TicketModel.assigned_team_id == team_id)
+    if priority:
+        query = query.filter(TicketModel.priority == priority)
+    if created_from:
+        query = query.filter(TicketModel.created_at >= created_from)
+    if created_to:
+        query = query.filter(TicketModel.created_at < created_to)
+
+    filename = f"tickets_{datetime.datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(query.order_by(TicketModel.id).statement, names, format),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.post("/", response_model=Ticket)
@@ -52,32 +286,60 @@ def create_ticket(
         priority=ticket_in.priority,
         created_by_id=current_user.id,
         status=TicketStatus.OPEN,
-        history=[]
     )
     db.add(ticket)
-    db.flush()  # get id before append_history
     ticket.append_history(
         event="CREATED",
         actor_name=current_user.full_name,
         actor_role=current_user.role.value
     )
+    bump_stats(db, {stat_key(TicketStatus.OPEN, ticket_in.priority, None): 1})
+    start_metrics(db, ticket)
+    db.flush()
+    notify_users(db, [(
+        UserModel.role == UserRole.G1, f"New ticket created by {current_user.full_name}: {ticket.title}"
+    )], ticket.id)
     db.commit()
-    db.refresh(ticket)
 
-    # Notify G1 users
+    return load_ticket(db, ticket.id)
+
+
+@router.post("/import", response_model=TicketImportReport)
+def import_tickets(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, enum=list(IMPORT_FORMATS), description="Default: from the file name"),
+    created_by_id: Optional[int] = Query(None, description="User the tickets are raised by; default yourself"),
+    notify: bool = Query(False, description="Send G1 users one summary notification"),
+    dry_run: bool = False,
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk-import tickets from CSV (with a header line) or NDJSON (Admin only).
+    Each row needs a title and description and may set a priority; rows that
+    fail validation are reported by line number and skipped.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    fmt = format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Pass format=csv or format=ndjson")
+
+    creator = current_user
+    if created_by_id is not None and created_by_id != current_user.id:
+        creator = db.query(UserModel).filter(UserModel.id == created_by_id).first()
+        if not creator:
+            raise HTTPException(status_code=404, detail="User not found")
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
     try:
-        g1_users = db.query(UserModel).filter(UserModel.role == UserRole.G1).all()
-        for g1 in g1_users:
-            db.add(Notification(
-                recipient_id=g1.id,
-                ticket_id=ticket.id,
-                message=f"New ticket created by {current_user.full_name}: {ticket.title}"
-            ))
-        db.commit()
-    except Exception:
+        report = run_import(db, stream, fmt, creator, current_user, notify=notify, dry_run=dry_run)
+    except UnicodeDecodeError as e:
         db.rollback()
-
-    return ticket
+        raise HTTPException(status_code=400, detail=f"File is not UTF-8: {e}")
+    return report
 
 
 @router.get("/{ticket_id}", response_model=Ticket)
@@ -85,19 +347,88 @@ def read_ticket(
     *,
     db: Session = Depends(deps.get_db),
     ticket_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserModel = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get ticket by ID. The ETag can be sent back as If-Match on a transition,
+    or as If-None-Match to get 304 Not Modified while the ticket is unchanged.
+    """
+    state = ticket_state(db, ticket_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    if not can_view_ticket(state, current_user):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    etag = quote_etag(ticket_validator(state), weak=True)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    response.headers.update({"ETag": etag, **CACHE_HEADERS})
+    return load_ticket(db, ticket_id)
+
+
+@router.get("/{ticket_id}/history", response_model=List[TicketEvent])
+def read_ticket_history(
+    *,
+    db: Session = Depends(deps.get_db),
+    ticket_id: int,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
-    """Get ticket by ID."""
+    """Get a page of the ticket's history, oldest first."""
     ticket = db.query(TicketModel).filter(TicketModel.id == ticket_id).first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    if current_user.role == UserRole.UNIT and ticket.created_by_id != current_user.id:
+    if not can_view_ticket(ticket, current_user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    if current_user.role == UserRole.TEAM and ticket.assigned_team_id != current_user.team_id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return (
+        db.query(TicketEventModel)
+        .filter(TicketEventModel.ticket_id == ticket_id)
+        .order_by(TicketEventModel.ts, TicketEventModel.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def _conflict(db: Session, ticket_id: int, status_code: int, message: str) -> HTTPException:
+    """An error carrying the ticket's current state, so the client can retry from it."""
+    current = load_ticket(db, ticket_id)
+    return HTTPException(
+        status_code=status_code,
+        detail={"message": message, "ticket": jsonable_encoder(Ticket.model_validate(current))},
+        headers={"ETag": ticket_etag(current)},
+    )
+
 
+def _transition(
+    db: Session,
+    ticket: TicketModel,
+    event: str,
+    current_user: UserModel,
+    response: Response,
+    if_match: Optional[str],
+    **kwargs,
+) -> Any:
+    """Apply a status transition and return the ticket as the endpoints serialize it."""
+    version_tag = quote_etag(f"ticket-{ticket.id}-v{ticket.version}", weak=True)
+    if precondition_failed(_version_tags(if_match), version_tag):
+        raise _conflict(db, ticket.id, 412, "Ticket has changed since it was fetched")
+    try:
+        apply_transition(db, ticket, event, current_user, **kwargs)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StaleTicket as e:
+        raise _conflict(db, ticket.id, 409, str(e))
+
+    ticket = load_ticket(db, ticket.id)
+    response.headers["ETag"] = ticket_etag(ticket)
     return ticket
 
 
@@ -107,6 +438,8 @@ def allocate_ticket(
     db: Session = Depends(deps.get_db),
     ticket_id: int,
     allocation: TicketAllocate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
     """Allocate ticket to a team (G1 only)."""
@@ -117,44 +450,20 @@ def allocate_ticket(
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    team = db.query(TeamModel).filter(TeamModel.id == allocation.team_id).first()
-    team_name = team.name if team else f"Team#{allocation.team_id}"
-
-    ticket.assigned_team_id = allocation.team_id
+    values = {"assigned_team_id": allocation.team_id}
     if allocation.priority:
-        ticket.priority = allocation.priority
-    ticket.status = TicketStatus.ALLOCATED
-    ticket.append_history(
-        event="ALLOCATED",
-        actor_name=current_user.full_name,
-        actor_role=current_user.role.value,
-        team_id=allocation.team_id,
-        team_name=team_name
-    )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+        values["priority"] = allocation.priority
 
     # Notify team members and unit (creator)
-    try:
-        team_members = db.query(UserModel).filter(UserModel.team_id == allocation.team_id).all()
-        for member in team_members:
-            db.add(Notification(
-                recipient_id=member.id,
-                ticket_id=ticket.id,
-                message=f"Ticket allocated to your team: {ticket.title}"
-            ))
-        if ticket.created_by_id:
-            db.add(Notification(
-                recipient_id=ticket.created_by_id,
-                ticket_id=ticket.id,
-                message=f"Your ticket '{ticket.title}' has been allocated to a team."
-            ))
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    return ticket
+    return _transition(
+        db, ticket, "ALLOCATED", current_user, response, if_match,
+        values=values,
+        team_id=allocation.team_id,
+        notify=[
+            (UserModel.team_id == allocation.team_id, f"Ticket allocated to your team: {ticket.title}"),
+            (UserModel.id == ticket.created_by_id, f"Your ticket '{ticket.title}' has been allocated to a team."),
+        ],
+    )
 
 
 @router.patch("/{ticket_id}/resolve", response_model=Ticket)
@@ -163,6 +472,8 @@ def resolve_ticket(
     db: Session = Depends(deps.get_db),
     ticket_id: int,
     resolution: TicketResolve,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
     """Mark ticket for review (Team Member only)."""
@@ -177,39 +488,18 @@ def resolve_ticket(
     if current_user.role == UserRole.TEAM and ticket.assigned_team_id != current_user.team_id:
         raise HTTPException(status_code=403, detail="Ticket not assigned to your team")
 
-    ticket.resolution_notes = resolution.resolution_notes
-    ticket.resolved_by_id = current_user.id
-    ticket.status = TicketStatus.RESOLVED
-    ticket.append_history(
-        event="MARKED_FOR_REVIEW",
-        actor_name=current_user.full_name,
-        actor_role=current_user.role.value,
-        notes=resolution.resolution_notes
-    )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
-
     # Notify G1 and unit (creator)
-    try:
-        g1_users = db.query(UserModel).filter(UserModel.role == UserRole.G1).all()
-        for g1 in g1_users:
-            db.add(Notification(
-                recipient_id=g1.id,
-                ticket_id=ticket.id,
-                message=f"Ticket marked for review by {current_user.full_name}: {ticket.title}"
-            ))
-        if ticket.created_by_id:
-            db.add(Notification(
-                recipient_id=ticket.created_by_id,
-                ticket_id=ticket.id,
-                message=f"Your ticket '{ticket.title}' has been marked for review. Please verify."
-            ))
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    return ticket
+    return _transition(
+        db, ticket, "MARKED_FOR_REVIEW", current_user, response, if_match,
+        values={"resolution_notes": resolution.resolution_notes, "resolved_by_id": current_user.id},
+        notes=resolution.resolution_notes,
+        notify=[
+            (UserModel.role == UserRole.G1,
+             f"Ticket marked for review by {current_user.full_name}: {ticket.title}"),
+            (UserModel.id == ticket.created_by_id,
+             f"Your ticket '{ticket.title}' has been marked for review. Please verify."),
+        ],
+    )
 
 
 @router.patch("/{ticket_id}/close", response_model=Ticket)
@@ -217,10 +507,18 @@ def close_ticket(
     *,
     db: Session = Depends(deps.get_db),
     ticket_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
     """Approve and close ticket (Unit User only)."""
-    ticket = db.query(TicketModel).filter(TicketModel.id == ticket_id).first()
+    # The completion certificate records the people and history too
+    ticket = (
+        db.query(TicketModel)
+        .options(joinedload(TicketModel.creator), joinedload(TicketModel.resolver), subqueryload(TicketModel.events))
+        .filter(TicketModel.id == ticket_id)
+        .first()
+    )
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
@@ -230,64 +528,39 @@ def close_ticket(
     if current_user.role == UserRole.UNIT and ticket.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    ticket.status = TicketStatus.CLOSED
-    ticket.append_history(
-        event="APPROVED_AND_CLOSED",
-        actor_name=current_user.full_name,
-        actor_role=current_user.role.value
-    )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    def add_certificate(ticket: TicketModel, closing_event: TicketEventModel) -> None:
+        # Automatically generate Issue Completion Certificate. It is best effort:
+        # written in a savepoint, so a failure rolls back only the certificate
+        from app.api.v1.endpoints.documents import add_document
 
-    # Automatically generate Issue Completion Certificate
-    try:
-        from app.api.v1.endpoints.documents import save_document_data
-        from app.models.document_content import CompletionCertificateContent
-        import datetime
-        
-        # Prepare data for the certificate
-        closing_data = {
-            "ticket_id": ticket.id,
-            "title": ticket.title,
-            "description": ticket.description,
-            "resolution_notes": ticket.resolution_notes,
-            "created_at": ticket.created_at.isoformat() if ticket.created_at else "",
-            "closed_at": datetime.datetime.utcnow().isoformat(),
-            "created_by": ticket.creator.full_name if ticket.creator else "Unknown",
-            "resolved_by": ticket.resolver.full_name if ticket.resolver else "N/A",
-            "history": ticket.history
-        }
-        
-        save_document_data(
-            template_name="issue_completion.html",
-            ticket_id=ticket.id,
-            data=closing_data,
-            db=db,
-            document_type="completion_certificate",
-            content_model=CompletionCertificateContent
-        )
-        db.refresh(ticket)
-    except Exception as e:
-        # We don't want to fail the ticket closure if document generation fails
-        # but we should log it
-        print(f"Error generating closing document: {e}")
+        try:
+            with db.begin_nested():
+                # Prepare data for the certificate
+                closing_data = {
+                    "ticket_id": ticket.id,
+                    "title": ticket.title,
+                    "description": ticket.description,
+                    "resolution_notes": ticket.resolution_notes,
+                    "created_at": ticket.created_at.isoformat() if ticket.created_at else "",
+                    "closed_at": datetime.datetime.utcnow().isoformat(),
+                    "created_by": ticket.creator.full_name if ticket.creator else "Unknown",
+                    "resolved_by": ticket.resolver.full_name if ticket.resolver else "N/A",
+                    "history": ticket.history + [closing_event.as_dict()]
+                }
+
+                add_document("completion_certificate", ticket.id, closing_data, db)
+        except Exception:
+            logger.exception("Failed to generate the completion certificate for ticket %s", ticket.id)
 
     # Notify team that their resolution was approved
+    notify = []
     if ticket.assigned_team_id:
-        try:
-            team_members = db.query(UserModel).filter(UserModel.team_id == ticket.assigned_team_id).all()
-            for member in team_members:
-                db.add(Notification(
-                    recipient_id=member.id,
-                    ticket_id=ticket.id,
-                    message=f"Resolution approved for ticket: {ticket.title}"
-                ))
-            db.commit()
-        except Exception:
-            db.rollback()
+        notify.append((UserModel.team_id == ticket.assigned_team_id, f"Resolution approved for ticket: {ticket.title}"))
 
-    return ticket
+    return _transition(
+        db, ticket, "APPROVED_AND_CLOSED", current_user, response, if_match,
+        notify=notify, before_commit=add_certificate,
+    )
 
 
 @router.patch("/{ticket_id}/reallocate-to-g1", response_model=Ticket)
@@ -295,6 +568,8 @@ def reallocate_to_g1(
     *,
     db: Session = Depends(deps.get_db),
     ticket_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
     """Unit rejects resolution — sends ticket back to G1 for reassignment."""
@@ -308,43 +583,18 @@ def reallocate_to_g1(
     if current_user.role == UserRole.UNIT and ticket.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    old_team_id = ticket.assigned_team_id
-    ticket.status = TicketStatus.OPEN
-    ticket.assigned_team_id = None
-    ticket.resolved_by_id = None
-    ticket.resolution_notes = None
-    ticket.append_history(
-        event="REALLOCATED_TO_G1",
-        actor_name=current_user.full_name,
-        actor_role=current_user.role.value,
-        notes="Unit rejected resolution — sent back to G1 for reassignment"
-    )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
-
     # Notify G1 and old team (if any)
-    try:
-        g1_users = db.query(UserModel).filter(UserModel.role == UserRole.G1).all()
-        for g1 in g1_users:
-            db.add(Notification(
-                recipient_id=g1.id,
-                ticket_id=ticket.id,
-                message=f"Ticket '{ticket.title}' returned by unit — requires reassignment."
-            ))
-        if old_team_id:
-            team_members = db.query(UserModel).filter(UserModel.team_id == old_team_id).all()
-            for member in team_members:
-                db.add(Notification(
-                    recipient_id=member.id,
-                    ticket_id=ticket.id,
-                    message=f"Your resolution for ticket '{ticket.title}' was rejected by the unit."
-                ))
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    return ticket
+    notify = [(UserModel.role == UserRole.G1, f"Ticket '{ticket.title}' returned by unit — requires reassignment.")]
+    if ticket.assigned_team_id:
+        notify.append((UserModel.team_id == ticket.assigned_team_id,
+                       f"Your resolution for ticket '{ticket.title}' was rejected by the unit."))
+
+    return _transition(
+        db, ticket, "REALLOCATED_TO_G1", current_user, response, if_match,
+        values={"assigned_team_id": None, "resolved_by_id": None, "resolution_notes": None},
+        notes="Unit rejected resolution — sent back to G1 for reassignment",
+        notify=notify,
+    )
 
 
 @router.patch("/{ticket_id}/reallocate-to-team", response_model=Ticket)
@@ -352,6 +602,8 @@ def reallocate_to_same_team(
     *,
     db: Session = Depends(deps.get_db),
     ticket_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserModel = Depends(deps.get_current_active_user),
 ) -> Any:
     """Unit rejects resolution but reassigns to the same team to retry."""
@@ -368,35 +620,12 @@ def reallocate_to_same_team(
     if not ticket.assigned_team_id:
         raise HTTPException(status_code=400, detail="No team currently assigned to reallocate to")
 
-    team = db.query(TeamModel).filter(TeamModel.id == ticket.assigned_team_id).first()
-    team_name = team.name if team else f"Team#{ticket.assigned_team_id}"
-
-    ticket.status = TicketStatus.ALLOCATED
-    ticket.resolved_by_id = None
-    ticket.resolution_notes = None
-    ticket.append_history(
-        event="REALLOCATED_TO_SAME_TEAM",
-        actor_name=current_user.full_name,
-        actor_role=current_user.role.value,
+    # Notify team to retry
+    return _transition(
+        db, ticket, "REALLOCATED_TO_SAME_TEAM", current_user, response, if_match,
+        values={"resolved_by_id": None, "resolution_notes": None},
         team_id=ticket.assigned_team_id,
-        team_name=team_name,
-        notes="Unit rejected resolution — reassigned to same team to retry"
+        notes="Unit rejected resolution — reassigned to same team to retry",
+        notify=[(UserModel.team_id == ticket.assigned_team_id,
+                 f"Please retry your resolution for ticket: '{ticket.title}'. Unit has returned it.")],
     )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
-
-    # Notify team to retry
-    try:
-        team_members = db.query(UserModel).filter(UserModel.team_id == ticket.assigned_team_id).all()
-        for member in team_members:
-            db.add(Notification(
-                recipient_id=member.id,
-                ticket_id=ticket.id,
-                message=f"Please retry your resolution for ticket: '{ticket.title}'. Unit has returned it."
-            ))
-        db.commit()
-    except Exception:
-        db.rollback()
-
-    return ticket
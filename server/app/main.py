@@ -1,11 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
+from app.services.documents.browser_pool import browser_pool
+from app.services.documents.html_generator import preload_templates
 
 # Database schema is managed by Alembic migrations.
 # Run: alembic upgrade head
 
-app = FastAPI(title="Ticket Management System API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile document templates and keep warm Chromium instances around
+    preload_templates()
+    browser_pool.start()
+    yield
+    browser_pool.stop()
+
+
+app = FastAPI(title="Ticket Management System API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 origins = [
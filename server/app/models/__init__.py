@@ -6,8 +6,8 @@ from app.models.ticket import Ticket  # noqa: F401
 from app.models.comment import Comment  # noqa: F401
 from app.models.notification import Notification  # noqa: F401
 from app.models.document import TicketDocument  # noqa: F401
-from app.models.document_content import (  # noqa: F401
-    VoucherContent, OutboundDeliveryContent,
-    VoucherVariableQtyContent, VoucherWithTitleContent,
-    VoucherWithExplanationContent
-)
+from app.models.render_job import RenderJob  # noqa: F401
+from app.models.document_content import DocumentContent  # noqa: F401
+from app.models.ticket_event import TicketEvent  # noqa: F401
+from app.models.ticket_stat import TicketStat  # noqa: F401
+from app.models.ticket_metrics import TicketMetrics  # noqa: F401
@@ -7,11 +7,13 @@ class TicketDocument(Base):
     __tablename__ = "ticket_documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)
     file_id = Column(String, unique=True, index=True, nullable=False)
     template_name = Column(String, nullable=False)
     document_type = Column(String, default="voucher")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    ticket = relationship("Ticket", backref="documents")
+    ticket = relationship("Ticket", back_populates="documents")
+    content = relationship("DocumentContent", back_populates="document", uselist=False,
+                           cascade="all, delete-orphan", passive_deletes=True)
@@ -1,69 +1,23 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
-class VoucherContent(Base):
-    __tablename__ = "voucher_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="voucher_content_entries")
-    document = relationship("TicketDocument", backref="voucher_content")
-
-class OutboundDeliveryContent(Base):
-    __tablename__ = "outbound_delivery_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="outbound_delivery_entries")
-    document = relationship("TicketDocument", backref="outbound_delivery_content")
+class DocumentContent(Base):
+    """Structured data of a document, one row per TicketDocument for every document type."""
+    __tablename__ = "document_contents"
+    __table_args__ = (
+        # Serves containment (@>) lookups on header fields and line items
+        Index("ix_document_contents_data", "data",
+              postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"}),
+    )
 
-class VoucherVariableQtyContent(Base):
-    __tablename__ = "voucher_variable_qty_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="voucher_variable_qty_entries")
-    document = relationship("TicketDocument", backref="voucher_variable_qty_content")
+    document_id = Column(Integer, ForeignKey("ticket_documents.id", ondelete="CASCADE"), primary_key=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)
+    data = Column(JSONB, nullable=False)
 
-class VoucherWithTitleContent(Base):
-    __tablename__ = "voucher_with_title_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="voucher_with_title_entries")
-    document = relationship("TicketDocument", backref="voucher_with_title_content")
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-class VoucherWithExplanationContent(Base):
-    __tablename__ = "voucher_with_explanation_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="voucher_with_explanation_entries")
-    document = relationship("TicketDocument", backref="voucher_with_explanation_content")
-class CompletionCertificateContent(Base):
-    __tablename__ = "completion_certificate_contents"
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    ticket = relationship("Ticket", backref="completion_certificate_entries")
-    document = relationship("TicketDocument", backref="completion_certificate_content")
+    document = relationship("TicketDocument", back_populates="content")
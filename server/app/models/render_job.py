@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, JSON, ForeignKey, DateTime, Enum, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class RenderJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"     # Waiting for a worker (or for its retry delay)
+    RUNNING = "RUNNING"   # Claimed by a worker
+    DONE = "DONE"         # PDF is in the PDF cache under cache_key
+    FAILED = "FAILED"     # Gave up after max_attempts
+
+class RenderJob(Base):
+    __tablename__ = "render_jobs"
+    __table_args__ = (
+        Index("ix_render_jobs_pending", "run_after", "id",
+              postgresql_where=text("status IN ('QUEUED', 'RUNNING')")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True, nullable=False)
+    document_id = Column(Integer, ForeignKey("ticket_documents.id"), nullable=False)
+
+    # Snapshot of what to render, taken at submission time
+    template_name = Column(String, nullable=False)
+    landscape = Column(Boolean, default=False, nullable=False)
+    payload = Column(JSON, nullable=False)
+    cache_key = Column(String, nullable=False)
+
+    status = Column(Enum(RenderJobStatus), default=RenderJobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    error = Column(Text, nullable=True)
+    worker = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    document = relationship("TicketDocument")
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, Text, ForeignKey, DateTime, Enum, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, object_session, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.ticket_event import TicketEvent
 import enum
-import datetime as dt
 
 class TicketStatus(str, enum.Enum):
     OPEN = "OPEN"           # Created by Unit
@@ -19,9 +20,22 @@ class TicketPriority(str, enum.Enum):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Role-scoped and status-filtered listings, newest first (keyset order)
+        Index("ix_tickets_created_by_id_created_at", "created_by_id", "created_at", "id"),
+        Index("ix_tickets_assigned_team_id_created_at", "assigned_team_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        Index("ix_tickets_created_at", "created_at", "id"),
+        Index("ix_tickets_priority_created_at", "priority", "created_at", "id"),
+        # Change feed (see app/services/tickets/changes.py)
+        Index("ix_tickets_change_xid", "change_xid", "id"),
+        # Search (see app/services/tickets/search.py)
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tickets_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True, nullable=False)
+    title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     status = Column(Enum(TicketStatus), default=TicketStatus.OPEN)
     priority = Column(Enum(TicketPriority), default=TicketPriority.MEDIUM)
@@ -31,10 +45,16 @@ class Ticket(Base):
     resolved_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     
     resolution_notes = Column(Text, nullable=True)
-    history = Column(JSON, default=list, nullable=True)
+    # Bumped by every status transition; compared-and-swapped to reject stale writes
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Maintained by database triggers from the text fields and comments
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Also touched by database triggers when history or documents are added
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Transaction that last wrote the row; a database trigger sets it on every update
+    change_xid = Column(BigInteger, server_default=text("pg_current_xact_id()::text::bigint"), nullable=False)
 
     creator = relationship("User", back_populates="tickets_created", foreign_keys=[created_by_id])
     assigned_team = relationship("Team", back_populates="tickets")
@@ -42,19 +62,33 @@ class Ticket(Base):
     
     comments = relationship("Comment", back_populates="ticket", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="ticket")
+    documents = relationship("TicketDocument", back_populates="ticket")
+    events = relationship(
+        "TicketEvent", back_populates="ticket", order_by=[TicketEvent.ts, TicketEvent.id],
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    # ORM flushes of a changed ticket are checked against the version too
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def history(self) -> list:
+        """The ticket's events, oldest first, as plain dicts."""
+        return [e.as_dict() for e in self.events]
 
     def append_history(self, event: str, actor_name: str, actor_role: str, team_id=None, team_name=None, notes=None):
-        """Append a history event to the ticket's history JSON column."""
-        from sqlalchemy.orm.attributes import flag_modified
-        current = self.history or []
-        current.append({
-            "event": event,
-            "actor": actor_name,
-            "role": actor_role,
-            "team_id": team_id,
-            "team_name": team_name,
-            "notes": notes,
-            "timestamp": dt.datetime.utcnow().isoformat()
-        })
-        self.history = current
-        flag_modified(self, "history")
+        """Record a history event as a new ``ticket_events`` row."""
+        # Setting the backref queues the row on ``events`` without loading the
+        # existing ones; the session still has to be told about it explicitly.
+        entry = TicketEvent(
+            ticket=self,
+            event=event,
+            actor=actor_name,
+            role=actor_role,
+            team_id=team_id,
+            team_name=team_name,
+            notes=notes,
+        )
+        session = object_session(self)
+        if session is not None:
+            session.add(entry)
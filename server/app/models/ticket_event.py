@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class TicketEvent(Base):
+    """One entry of a ticket's history. Rows are only ever inserted."""
+    __tablename__ = "ticket_events"
+    __table_args__ = (
+        Index("ix_ticket_events_ticket_id_ts", "ticket_id", "ts"),
+        Index("ix_ticket_events_actor_ts", "actor", "ts"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), nullable=False)
+
+    event = Column(String, nullable=False)
+    actor = Column(String, nullable=False)
+    role = Column(String, nullable=False)
+    # Team name is copied so the history still reads correctly after renames
+    team_id = Column(Integer, nullable=True)
+    team_name = Column(String, nullable=True)
+    notes = Column(Text, nullable=True)
+
+    ts = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    ticket = relationship("Ticket", back_populates="events")
+
+    def as_dict(self) -> dict:
+        """The entry in the shape of the former ``tickets.history`` JSON."""
+        return {
+            "event": self.event,
+            "actor": self.actor,
+            "role": self.role,
+            "team_id": self.team_id,
+            "team_name": self.team_name,
+            "notes": self.notes,
+            "timestamp": self.ts.isoformat() if self.ts else None,
+        }
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+from app.models.ticket import TicketStatus, TicketPriority
+
+class TicketMetrics(Base):
+    """
+    Lifecycle durations of one ticket, in whole seconds, updated as each
+    status transition is recorded (see app/services/tickets/analytics.py).
+    Time spent in the current state is not counted until the ticket leaves it.
+    """
+    __tablename__ = "ticket_metrics"
+    __table_args__ = (
+        Index("ix_ticket_metrics_created_at", "created_at"),
+        Index("ix_ticket_metrics_team_id_created_at", "team_id", "created_at"),
+    )
+
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True)
+    # Last team the ticket was allocated to; kept when it goes back to G1
+    team_id = Column(Integer, nullable=True)
+    priority = Column(Enum(TicketPriority), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    state = Column(Enum(TicketStatus), nullable=False)
+    state_since = Column(DateTime(timezone=True), nullable=False)
+
+    allocate_seconds = Column(Integer, nullable=True)  # created -> first allocation
+    resolve_seconds = Column(Integer, nullable=True)   # created -> approved and closed
+    reopen_count = Column(Integer, nullable=False, default=0)  # resolutions sent back by the unit
+    open_seconds = Column(Integer, nullable=False, default=0)
+    allocated_seconds = Column(Integer, nullable=False, default=0)
+    resolved_seconds = Column(Integer, nullable=False, default=0)
+
+    ticket = relationship("Ticket")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Enum
+from app.core.database import Base
+from app.models.ticket import TicketStatus, TicketPriority
+
+class TicketStat(Base):
+    """
+    Number of tickets in each (status, priority, team) cell, kept up to date
+    by the transactions that create and move tickets. ``team_id`` 0 counts
+    tickets not allocated to a team.
+    """
+    __tablename__ = "ticket_stats"
+
+    status = Column(Enum(TicketStatus), primary_key=True)
+    priority = Column(Enum(TicketPriority), primary_key=True)
+    team_id = Column(Integer, primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -11,13 +11,17 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Most users (G1, UNIT) belong to no team
+        Index("ix_users_team_id", "team_id", postgresql_where=text("team_id IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String)
     is_active = Column(Boolean, default=True)
-    role = Column(Enum(UserRole), default=UserRole.UNIT)
+    role = Column(Enum(UserRole), default=UserRole.UNIT, index=True)
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
 
     team = relationship("Team", back_populates="members")
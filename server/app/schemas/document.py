@@ -165,6 +165,26 @@ class DocumentResponse(BaseModel):
     message: str = "Document generated successfully"
 
 
+class RenderJobResponse(BaseModel):
+    job_id: str
+    file_id: str
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
+    finished_at: Optional[dt.datetime] = None
+    result: str
+
+
+class DocumentSearchResult(BaseModel):
+    file_id: str
+    document_type: str
+    created_at: Optional[dt.datetime] = None
+    ticket_id: int
+    ticket_title: str
+    ticket_status: str
+
+
 class TicketDocumentSchema(BaseModel):
     id: int
     ticket_id: int
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Any, Dict, Union
 from datetime import datetime
 from app.models.ticket import TicketStatus, TicketPriority
 from app.schemas.user import User
@@ -28,6 +28,65 @@ class TicketAllocate(BaseModel):
 class TicketResolve(BaseModel):
     resolution_notes: str
 
+class TicketEvent(BaseModel):
+    id: int
+    event: str
+    actor: str
+    role: str
+    team_id: Optional[int] = None
+    team_name: Optional[str] = None
+    notes: Optional[str] = None
+    timestamp: datetime = Field(validation_alias="ts")
+
+    class Config:
+        from_attributes = True
+
+class TicketSearchResult(BaseModel):
+    id: int
+    title: str
+    status: TicketStatus
+    priority: TicketPriority
+    created_at: datetime
+    rank: float
+    match: str  # "fulltext" or "fuzzy"
+
+class TicketStatsCell(BaseModel):
+    status: TicketStatus
+    priority: TicketPriority
+    team_id: Optional[int] = None  # None counts unallocated tickets
+    count: int
+
+class TicketStats(BaseModel):
+    total: int
+    by_status: Dict[TicketStatus, int]
+    cells: List[TicketStatsCell]
+
+class TicketLifecycleStats(BaseModel):
+    # Group keys; only those asked for are set
+    team: Optional[int] = None
+    priority: Optional[TicketPriority] = None
+    period: Optional[datetime] = None
+    tickets: int
+    # Durations in seconds
+    allocate_p50: Optional[float] = None
+    allocate_p90: Optional[float] = None
+    resolve_p50: Optional[float] = None
+    resolve_p90: Optional[float] = None
+    reopens: int
+    reopened_tickets: int
+    open_avg: Optional[float] = None
+    allocated_avg: Optional[float] = None
+    resolved_avg: Optional[float] = None
+
+class TicketImportError(BaseModel):
+    line: int
+    error: str
+
+class TicketImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TicketImportError]  # at most the first 1000
+
 class TicketInDBBase(TicketBase):
     id: int
     status: TicketStatus
@@ -38,6 +97,7 @@ class TicketInDBBase(TicketBase):
     history: Optional[List[Any]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
@@ -49,3 +109,14 @@ class Ticket(TicketInDBBase):
     assigned_team: Optional[TeamInDBBase] = None
     resolver: Optional[User] = None
     documents: List[TicketDocumentSchema] = []
+
+class TicketPage(BaseModel):
+    # Full tickets, or plain dicts when the listing asked for sparse fields
+    items: List[Union[Ticket, Dict[str, Any]]]
+    next_cursor: Optional[str] = None
+
+class TicketChanges(BaseModel):
+    # Changed tickets, oldest change first; poll again with ``cursor``
+    items: List[Ticket]
+    cursor: str
+    has_more: bool = False
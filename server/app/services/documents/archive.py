@@ -0,0 +1,142 @@
+"""
+Streaming ZIP archives of rendered documents.
+
+Documents are rendered concurrently (at most ``concurrency`` at a time) and
+each PDF is written into the archive as soon as it is ready; the bytes
+produced so far are yielded immediately, so only the PDFs currently in
+flight are ever held in memory - never the archive itself.
+
+``archive_entries`` reads the documents through a server-side cursor
+``EXPORT_BATCH_SIZE`` rows at a time, on a session of its own that stays
+open while the archive streams, so the document payloads are not loaded
+up front either.
+"""
+import io
+import itertools
+import logging
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy.sql import Select
+
+from app.core.database import SessionLocal
+from app.services.documents.rendering import render_document, is_landscape
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CONCURRENCY = int(os.getenv("DOCUMENT_EXPORT_CONCURRENCY", "4"))
+EXPORT_BATCH_SIZE = int(os.getenv("DOCUMENT_EXPORT_BATCH_SIZE", "100"))
+
+
+@dataclass
+class ArchiveEntry:
+    ticket_id: int
+    file_id: str
+    document_type: str
+    template_name: str
+    data: dict
+
+    @property
+    def arcname(self) -> str:
+        return f"ticket_{self.ticket_id}/{self.document_type}_{self.file_id}.pdf"
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, non-seekable buffer that ``zipfile`` streams into."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_entries(statement: Select) -> Optional[Iterator[ArchiveEntry]]:
+    """
+    Entries for the rows of ``statement`` (ticket_id, file_id, document_type,
+    template_name, data), or None if it matches nothing. The session is
+    closed once the entries are exhausted or the iterator is closed.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            statement, execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE}
+        )
+        first = next(result, None)
+    except Exception:
+        db.close()
+        raise
+    if first is None:
+        db.close()
+        return None
+
+    def entries() -> Iterator[ArchiveEntry]:
+        try:
+            for row in itertools.chain([first], result):
+                yield ArchiveEntry(
+                    ticket_id=row.ticket_id,
+                    file_id=row.file_id,
+                    document_type=row.document_type,
+                    template_name=row.template_name,
+                    data=row.data,
+                )
+        finally:
+            db.close()
+
+    return entries()
+
+
+def _render(entry: ArchiveEntry) -> bytes:
+    return render_document(entry.template_name, entry.data, is_landscape(entry.document_type))
+
+
+def stream_archive(entries: Iterable[ArchiveEntry], concurrency: int = EXPORT_CONCURRENCY) -> Iterator[bytes]:
+    """Yield a ZIP archive of the PDFs for ``entries`` chunk by chunk."""
+    sink = _ZipSink()
+    failures = []
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="doc-export") as executor:
+        pending = {}
+        entries = iter(entries)
+
+        def fill():
+            for entry in entries:
+                pending[executor.submit(_render, entry)] = entry
+                if len(pending) >= concurrency:
+                    break
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry = pending.pop(future)
+                try:
+                    archive.writestr(entry.arcname, future.result())
+                except Exception as e:
+                    logger.exception("Export of document %s failed", entry.file_id)
+                    failures.append(f"{entry.arcname}: {e}")
+                yield sink.drain()
+            fill()
+
+        if failures:
+            archive.writestr("ERRORS.txt", "\n".join(failures) + "\n")
+
+    yield sink.drain()
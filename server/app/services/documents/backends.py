@@ -0,0 +1,70 @@
+"""
+PDF rendering backends.
+
+``playwright`` prints through headless Chromium (browser pool) and renders
+any template faithfully. ``xhtml2pdf`` is a pure-Python renderer that runs
+in-process without a browser; it supports the table/border/text CSS used by
+the simple voucher layouts and is an order of magnitude cheaper to run.
+
+Each document type picks its backend in the registry; setting
+``DOCUMENT_PDF_BACKEND`` forces one backend for every document (e.g. on a
+host without Chromium).
+"""
+import os
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Dict, Optional
+
+from app.services.documents.pdf_generator import html_to_pdf_bytes
+
+FORCED_BACKEND = os.getenv("DOCUMENT_PDF_BACKEND") or None
+
+
+class PdfBackend(ABC):
+    name = ""
+
+    @abstractmethod
+    def render(self, html: str, landscape: bool = False) -> bytes:
+        """Print ``html`` to PDF bytes."""
+
+
+class PlaywrightBackend(PdfBackend):
+    name = "playwright"
+
+    def render(self, html: str, landscape: bool = False) -> bytes:
+        return html_to_pdf_bytes(html, landscape=landscape)
+
+
+class XhtmlBackend(PdfBackend):
+    name = "xhtml2pdf"
+
+    # Same sheet as the Playwright backend. Chromium prints without page
+    # margins and relies on the templates' 20px body padding, which
+    # xhtml2pdf does not apply to <body>, so it becomes the page margin here.
+    PAGE_CSS = "<style>@page {{ size: a4 {orientation}; margin: 20px; }}</style>"
+
+    def render(self, html: str, landscape: bool = False) -> bytes:
+        from xhtml2pdf import pisa
+
+        page_css = self.PAGE_CSS.format(orientation="landscape" if landscape else "portrait")
+        html = html.replace("</head>", page_css + "</head>", 1) if "</head>" in html else page_css + html
+
+        output = BytesIO()
+        result = pisa.CreatePDF(html, dest=output, encoding="utf-8")
+        if result.err:
+            raise RuntimeError(f"xhtml2pdf failed with {result.err} error(s)")
+        return output.getvalue()
+
+
+BACKENDS: Dict[str, PdfBackend] = {
+    backend.name: backend for backend in (PlaywrightBackend(), XhtmlBackend())
+}
+
+
+def get_backend(name: Optional[str] = None) -> PdfBackend:
+    """Resolve a backend by name, honouring ``DOCUMENT_PDF_BACKEND``."""
+    name = FORCED_BACKEND or name or PlaywrightBackend.name
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown PDF backend: {name}")
@@ -0,0 +1,230 @@
+"""
+Long-lived pool of headless Chromium browsers used for PDF rendering.
+
+Playwright's sync API is bound to the thread that started it, so every
+browser in the pool is owned by a dedicated worker thread. Callers hand in
+a task (a callable that receives a fresh ``Page``) and wait on a future;
+each task runs in its own isolated browser context which is discarded
+afterwards. Browsers are recycled after ``max_renders`` renders or as soon
+as they are found disconnected (crashed). A worker that dies is logged and
+leaves the pool; once none is left, queued renders fail instead of waiting.
+
+Configuration (environment):
+    PDF_BROWSER_POOL_SIZE     number of browsers / worker threads (0 disables the pool)
+    PDF_BROWSER_MAX_RENDERS   renders served by one browser before it is relaunched
+    PDF_RENDER_TIMEOUT        seconds a caller waits for its render
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from playwright.sync_api import Page, sync_playwright
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("PDF_BROWSER_POOL_SIZE", "2"))
+MAX_RENDERS_PER_BROWSER = int(os.getenv("PDF_BROWSER_MAX_RENDERS", "200"))
+RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "60"))
+
+_STOP = object()
+
+
+class BrowserPool:
+    """Fixed-size pool of warm Chromium browsers, one per worker thread."""
+
+    def __init__(self, size: int = POOL_SIZE, max_renders: int = MAX_RENDERS_PER_BROWSER):
+        self.size = size
+        self.max_renders = max_renders
+        self._jobs: "queue.Queue[Any]" = queue.Queue()
+        self._workers: list = []
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._renders = 0
+        self._failures = 0
+        self._recycles = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return any(worker.is_alive() for worker in self._workers)
+
+    def start(self) -> None:
+        """Start the worker threads; each one launches its browser immediately."""
+        if self.is_running or self.size <= 0:
+            return
+        for index in range(self.size):
+            worker = threading.Thread(
+                target=self._worker, args=(index,), name=f"pdf-browser-{index}", daemon=True
+            )
+            with self._lock:
+                self._workers.append(worker)
+            worker.start()
+        logger.info("PDF browser pool started with %d browser(s)", self.size)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Ask every worker to close its browser and wait for them to exit."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._jobs.put(_STOP)
+        for worker in workers:
+            worker.join(timeout)
+
+    def submit(self, task: Callable[[Page], Any]) -> Future:
+        """Queue ``task`` for the next free browser and return its future."""
+        future: Future = Future()
+        # Under the lock, so the last worker to exit either sees the job or stops it being queued
+        with self._lock:
+            if not self.is_running:
+                raise RuntimeError("PDF browser pool is not running")
+            self._jobs.put((task, future, time.monotonic()))
+        return future
+
+    def run(self, task: Callable[[Page], Any], timeout: Optional[float] = RENDER_TIMEOUT) -> Any:
+        """Run ``task`` on a pooled page and return its result."""
+        future = self.submit(task)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Nobody is waiting any more; a worker that has not picked it up skips it
+            future.cancel()
+            raise
+
+    def stats(self) -> dict:
+        """Snapshot of pool utilisation, used to size the pool."""
+        with self._lock:
+            started = self._renders + self._failures
+            return {
+                "size": self.size if self.is_running else 0,
+                "busy": self._busy,
+                "idle": max(len(self._workers) - self._busy, 0),
+                "queued": self._jobs.qsize(),
+                "renders": self._renders,
+                "failures": self._failures,
+                "recycles": self._recycles,
+                "max_renders_per_browser": self.max_renders,
+                "queue_wait_avg_ms": round(self._wait_total / started * 1000, 2) if started else 0.0,
+                "queue_wait_max_ms": round(self._wait_max * 1000, 2),
+            }
+
+    # ── worker side ──────────────────────────────────────────────────────────
+
+    def _worker(self, index: int) -> None:
+        try:
+            self._serve(index)
+        except Exception:
+            logger.exception("PDF browser worker %d failed", index)
+        finally:
+            with self._lock:
+                me = threading.current_thread()
+                if me in self._workers:
+                    self._workers.remove(me)
+                if not self.is_running:
+                    self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        """Fail every queued render; called once no worker is left to serve them."""
+        stops = 0
+        while True:
+            try:
+                item = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stops += 1
+                continue
+            _, future, _ = item
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("PDF browser pool is not running"))
+        # Stop requests still belong to workers that are shutting down
+        for _ in range(stops):
+            self._jobs.put(_STOP)
+
+    def _serve(self, index: int) -> None:
+        with sync_playwright() as p:
+            browser = self._launch(p, index)
+            served = 0
+
+            while True:
+                item = self._jobs.get()
+                if item is _STOP:
+                    break
+
+                task, future, enqueued_at = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                waited = time.monotonic() - enqueued_at
+                with self._lock:
+                    self._busy += 1
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+
+                try:
+                    if browser is None or not browser.is_connected():
+                        browser = self._launch(p, index, required=True)
+                        served = 0
+                    future.set_result(self._render(browser, task))
+                    served += 1
+                    with self._lock:
+                        self._renders += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    with self._lock:
+                        self._failures += 1
+                    if browser is not None and not browser.is_connected():
+                        logger.warning("PDF browser %d crashed, relaunching on next render", index)
+                        browser = None
+                        with self._lock:
+                            self._recycles += 1
+                finally:
+                    with self._lock:
+                        self._busy -= 1
+
+                if browser is not None and served >= self.max_renders:
+                    self._close(browser)
+                    browser = self._launch(p, index)
+                    served = 0
+                    with self._lock:
+                        self._recycles += 1
+
+            if browser is not None:
+                self._close(browser)
+
+    @staticmethod
+    def _render(browser, task: Callable[[Page], Any]) -> Any:
+        context = browser.new_context()
+        try:
+            page = context.new_page()
+            page.set_default_timeout(RENDER_TIMEOUT * 1000)
+            return task(page)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _launch(p, index: int, required: bool = False):
+        try:
+            return p.chromium.launch()
+        except Exception:
+            if required:
+                raise
+            logger.exception("Failed to launch PDF browser %d", index)
+            return None
+
+    @staticmethod
+    def _close(browser) -> None:
+        try:
+            browser.close()
+        except Exception:
+            logger.exception("Failed to close PDF browser")
+
+
+browser_pool = BrowserPool()
@@ -1,24 +1,82 @@
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+import logging
 import os
 
+logger = logging.getLogger(__name__)
 
 TEMPLATE_DIR = os.path.join(
     os.path.dirname(__file__), "templates"
 )
+BYTECODE_CACHE_DIR = os.getenv(
+    "JINJA_BYTECODE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "jinja"),
+)
+
+
+class LazyBytecodeCache(FileSystemBytecodeCache):
+    """
+    Creates its directory when the first template is loaded rather than at
+    import; if it cannot be created, templates are rendered without caching.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self._ready = None
 
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+    def _usable(self) -> bool:
+        if self._ready is None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._ready = True
+            except OSError:
+                logger.exception("Jinja bytecode cache disabled: cannot create %s", self.directory)
+                self._ready = False
+        return self._ready
+
+    def load_bytecode(self, bucket) -> None:
+        if self._usable():
+            super().load_bytecode(bucket)
+
+    def dump_bytecode(self, bucket) -> None:
+        if self._usable():
+            super().dump_bytecode(bucket)
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    bytecode_cache=LazyBytecodeCache(BYTECODE_CACHE_DIR),
+)
+
+
+def preload_templates():
+    """
+    Compile every template up front so the first render of each one does
+    not pay for parsing; compiled bytecode is also persisted across restarts.
+    """
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    logger.info("Preloaded %d document templates", len(names))
+    return names
+
+
+def render_html(template_name: str, data: dict) -> str:
+    """
+    Render a Jinja2 template to an HTML string.
+    """
+    template = env.get_template(template_name)
+    return template.render(**data)
 
 
 def generate_html(template_name: str, data: dict, output_path: str):
     """
     Generate HTML using Jinja2 templates.
     """
-    template = env.get_template(template_name)
-    html = template.render(**data)
+    html = render_html(template_name, data)
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
     with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
 
-    return output_path
\ No newline at end of file
+    return output_path
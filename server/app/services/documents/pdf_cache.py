@@ -0,0 +1,217 @@
+"""
+Content-addressed on-disk cache of rendered PDFs.
+
+A rendered document is identified by a hash of everything that affects the
+output: the template name, the template source, the content data and the
+page orientation. Identical inputs always map to the same key, so edits to a
+document or its template naturally produce a new entry; stale entries fall
+out through LRU eviction once the cache exceeds its size budget.
+
+Concurrent requests for the same missing key share a single render.
+
+Configuration (environment):
+    PDF_CACHE_DIR      directory holding cached PDFs
+    PDF_CACHE_MAX_MB   size budget before least-recently-used entries are evicted
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from app.services.documents.html_generator import TEMPLATE_DIR
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv(
+    "PDF_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "cache", "pdf"),
+)
+CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_template_versions: dict = {}
+
+
+def template_version(template_name: str) -> str:
+    """Hash of the template source, recomputed only when the file changes."""
+    path = os.path.join(TEMPLATE_DIR, template_name)
+    mtime = os.path.getmtime(path)
+    cached = _template_versions.get(template_name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:16]
+    _template_versions[template_name] = (mtime, version)
+    return version
+
+
+def cache_key(template_name: str, data: dict, landscape: bool = False, backend: str = "") -> str:
+    """Stable key for one rendering of ``data`` through ``template_name``."""
+    payload = json.dumps(
+        {
+            "template": template_name,
+            "version": template_version(template_name),
+            "data": data,
+            "landscape": landscape,
+            "backend": backend,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Size-bounded LRU of PDFs on local disk with single-flight rendering."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict] = None  # key -> size, oldest first
+        self._total = 0
+        self._inflight: dict = {}
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file for ``key`` (marking it recently used) or None."""
+        path = self.path(key)
+        with self._lock:
+            entries = self._load()
+            if not os.path.exists(path):
+                self._total -= entries.pop(key, 0)
+                return None
+            if key in entries:
+                entries.move_to_end(key)
+            else:
+                # Rendered by another process sharing the directory
+                entries[key] = os.path.getsize(path)
+                self._total += entries[key]
+                self._evict()
+            return path
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached PDF for ``key``, calling ``render`` on a miss.
+        Callers that miss while another thread is rendering the same key
+        wait for that render instead of starting their own.
+        """
+        while True:
+            cached = self.read(key)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = Future()
+                    leader = True
+                else:
+                    leader = False
+
+            if not leader:
+                pending.result()
+                continue
+
+            try:
+                pdf_bytes = render()
+                self._store(key, pdf_bytes)
+                pending.set_result(None)
+                return pdf_bytes
+            except BaseException as e:
+                pending.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF bytes for ``key`` or None."""
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:  # evicted in between
+            return None
+
+    def discard(self, key: str) -> None:
+        """Drop ``key`` from the cache, e.g. after its document was edited."""
+        with self._lock:
+            entries = self._load()
+            size = entries.pop(key, None)
+            if size is not None:
+                self._total -= size
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._load()
+            return {
+                "entries": len(entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "rendering": len(self._inflight),
+            }
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _store(self, key: str, pdf_bytes: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f"{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, self.path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            entries = self._load()
+            self._total += len(pdf_bytes) - entries.pop(key, 0)
+            entries[key] = len(pdf_bytes)
+            self._evict()
+
+    def _load(self) -> OrderedDict:
+        """Index whatever is already on disk, oldest first (lock held)."""
+        if self._entries is not None:
+            return self._entries
+        found = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                full = os.path.join(self.directory, name)
+                if name.endswith(".tmp") and os.path.getmtime(full) < time.time() - 3600:
+                    os.remove(full)  # left behind by a crashed render
+                elif name.endswith(".pdf"):
+                    stat = os.stat(full)
+                    found.append((stat.st_mtime, name[:-4], stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total = sum(size for _, _, size in found)
+        return self._entries
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            logger.debug("Evicted cached PDF %s", key)
+
+
+pdf_cache = PdfCache()
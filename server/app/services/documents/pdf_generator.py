@@ -1,25 +1,54 @@
 from playwright.sync_api import sync_playwright
 import os
 
+from app.services.documents.browser_pool import browser_pool
 
-def html_to_pdf(html_path: str, pdf_path: str, landscape: bool = False):
 
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+def _print(page, landscape: bool, path: str = None) -> bytes:
+    return page.pdf(
+        path=path,
+        format="A4",
+        print_background=True,
+        landscape=landscape
+    )
+
+
+def _run(render):
+    """
+    Run ``render(page)`` on the warm browser pool when it is running,
+    otherwise on a one-off browser (scripts, shells, tests).
+    """
+    if browser_pool.is_running:
+        return browser_pool.run(render)
 
     with sync_playwright() as p:
         browser = p.chromium.launch()
-        page = browser.new_page()
+        try:
+            return render(browser.new_page())
+        finally:
+            browser.close()
 
-        page.goto(f"file:///{os.path.abspath(html_path)}")
-        page.wait_for_timeout(300)
 
-        page.pdf(
-            path=pdf_path,
-            format="A4",
-            print_background=True,
-            landscape=landscape
-        )
+def html_to_pdf_bytes(html: str, landscape: bool = False) -> bytes:
+    """
+    Print an HTML string to PDF entirely in memory.
+    """
+    def render(page):
+        page.set_content(html, wait_until="load")
+        return _print(page, landscape)
+
+    return _run(render)
 
-        browser.close()
 
-    return pdf_path
\ No newline at end of file
+def html_to_pdf(html_path: str, pdf_path: str, landscape: bool = False):
+    """
+    Print an HTML file to a PDF file with headless Chromium.
+    """
+    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+
+    def render(page):
+        page.goto(f"file:///{os.path.abspath(html_path)}")
+        _print(page, landscape, path=pdf_path)
+
+    _run(render)
+    return pdf_path
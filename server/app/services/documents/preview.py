@@ -0,0 +1,43 @@
+"""
+Browser-free HTML previews of documents.
+
+Previews are the rendered Jinja template itself, cached in memory by the
+same content hash the PDF cache uses, so repeated previews of an unchanged
+document cost a dictionary lookup.
+
+Configuration (environment):
+    PREVIEW_CACHE_SIZE   number of rendered previews kept in memory
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from app.services.documents.html_generator import render_html
+from app.services.documents.pdf_cache import cache_key
+
+PREVIEW_CACHE_SIZE = int(os.getenv("PREVIEW_CACHE_SIZE", "256"))
+
+_previews: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def preview_key(template_name: str, data: dict) -> str:
+    return cache_key(template_name, data)
+
+
+def render_preview(template_name: str, data: dict, key: str = None) -> str:
+    """Return the HTML for ``data``, rendering only on a cache miss."""
+    if key is None:
+        key = preview_key(template_name, data)
+    with _lock:
+        html = _previews.get(key)
+        if html is not None:
+            _previews.move_to_end(key)
+            return html
+
+    html = render_html(template_name, data)
+    with _lock:
+        _previews[key] = html
+        while len(_previews) > PREVIEW_CACHE_SIZE:
+            _previews.popitem(last=False)
+    return html
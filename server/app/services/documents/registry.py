@@ -0,0 +1,48 @@
+"""
+Registry of the document types the system can store and render.
+
+Every endpoint that creates, reads or renders a document looks its type up
+here instead of keeping its own mapping.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.schemas.document import (
+    VoucherRequest, OutboundDeliveryRequest, VoucherVariableQtyRequest,
+    VoucherTitleRequest, VoucherExplanationRequest, CompletionCertificateRequest
+)
+
+
+@dataclass(frozen=True)
+class DocumentType:
+    name: str
+    template_name: str
+    schema: Type[BaseModel]
+    landscape: bool = False
+    # Fastest backend that renders the template correctly (see backends.py)
+    pdf_backend: str = "playwright"
+
+
+DOCUMENT_TYPES: Dict[str, DocumentType] = {
+    t.name: t for t in (
+        DocumentType("voucher", "voucher.html", VoucherRequest, pdf_backend="xhtml2pdf"),
+        DocumentType("outbound_delivery", "outbound_delivery.html", OutboundDeliveryRequest, landscape=True),
+        DocumentType("voucher_variable_qty", "voucher_with_variable_qty.html", VoucherVariableQtyRequest),
+        DocumentType("voucher_title", "vouhcer_with_title.html", VoucherTitleRequest),
+        DocumentType("voucher_explanation", "voucher_with_explanation.html", VoucherExplanationRequest),
+        DocumentType("completion_certificate", "issue_completion.html", CompletionCertificateRequest),
+    )
+}
+
+
+_BY_TEMPLATE: Dict[str, DocumentType] = {t.template_name: t for t in DOCUMENT_TYPES.values()}
+
+
+def get_document_type(name: str) -> Optional[DocumentType]:
+    return DOCUMENT_TYPES.get(name)
+
+
+def get_document_type_for_template(template_name: str) -> Optional[DocumentType]:
+    return _BY_TEMPLATE.get(template_name)
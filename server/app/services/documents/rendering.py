@@ -0,0 +1,46 @@
+"""
+Document -> PDF rendering shared by the download endpoint and render workers.
+"""
+import datetime as dt
+import os
+from typing import Optional
+
+from app.services.documents.backends import PdfBackend, get_backend
+from app.services.documents.html_generator import TEMPLATE_DIR, render_html
+from app.services.documents.pdf_cache import pdf_cache, cache_key
+from app.services.documents.registry import get_document_type, get_document_type_for_template
+
+
+def is_landscape(document_type: str) -> bool:
+    """Wide tabular documents are printed in landscape."""
+    doc_type = get_document_type(document_type)
+    return bool(doc_type and doc_type.landscape)
+
+
+def backend_for_template(template_name: str) -> PdfBackend:
+    """The PDF backend chosen for ``template_name`` in the document registry."""
+    doc_type = get_document_type_for_template(template_name)
+    return get_backend(doc_type.pdf_backend if doc_type else None)
+
+
+def document_cache_key(template_name: str, data: dict, landscape: bool = False) -> str:
+    """PDF cache key of a document, including the backend that renders it."""
+    return cache_key(template_name, data, landscape, backend_for_template(template_name).name)
+
+
+def document_last_modified(template_name: str, changed_at: Optional[dt.datetime]) -> float:
+    """When a document's PDF last changed: its content or its template, whichever is newer."""
+    template_changed = os.path.getmtime(os.path.join(TEMPLATE_DIR, template_name))
+    return max(template_changed, changed_at.timestamp()) if changed_at else template_changed
+
+
+def render_document(template_name: str, data: dict, landscape: bool = False, key: Optional[str] = None) -> bytes:
+    """Return the PDF for ``data``, served from the PDF cache when possible."""
+    if key is None:
+        key = document_cache_key(template_name, data, landscape)
+
+    def render() -> bytes:
+        html = render_html(template_name, data)
+        return backend_for_template(template_name).render(html, landscape=landscape)
+
+    return pdf_cache.get_or_render(key, render)
@@ -0,0 +1,70 @@
+"""
+Synthetic document payloads.
+
+Builds a valid payload for any registered document type straight from its
+request schema, with ``items`` line items (or history entries for the
+completion certificate). Used by the backend comparison and the rendering
+benchmarks so every template is exercised without real ticket data.
+"""
+import datetime as dt
+import typing
+from typing import Any, Type
+
+from pydantic import BaseModel
+
+from app.services.documents.registry import get_document_type
+
+SAMPLE_DATE = dt.date(2024, 1, 15)
+
+# Keys read by issue_completion.html for each history row
+HISTORY_EVENTS = ("CREATED", "APPROVED", "ALLOCATED", "IN_PROGRESS", "RESOLVED", "CLOSED")
+
+
+def _sample_history(items: int) -> list:
+    start = dt.datetime.combine(SAMPLE_DATE, dt.time(9, 0))
+    return [
+        {
+            "timestamp": (start + dt.timedelta(hours=i)).isoformat(),
+            "event": HISTORY_EVENTS[i % len(HISTORY_EVENTS)],
+            "actor": f"User {i % 7}",
+            "role": "UNIT",
+            "notes": f"Sample note {i} for the ticket history",
+            "team_name": "Electrical" if i % 3 == 0 else None,
+        }
+        for i in range(items)
+    ]
+
+
+def _sample_value(name: str, annotation: Any, items: int, index: int) -> Any:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Union:
+        annotation = next(a for a in args if a is not type(None))
+        return _sample_value(name, annotation, items, index)
+    if origin in (list, typing.List):
+        (inner,) = args or (dict,)
+        if isinstance(inner, type) and issubclass(inner, BaseModel):
+            return [_sample_model(inner, items, i) for i in range(items)]
+        return _sample_history(items)
+    if annotation is int:
+        return index + 1
+    if name.startswith("date") or name.endswith(("_date", "_at")):
+        return (SAMPLE_DATE + dt.timedelta(days=index)).isoformat()
+    return f"{name.upper().replace('_', ' ')} {index + 1}"
+
+
+def _sample_model(schema: Type[BaseModel], items: int, index: int = 0) -> dict:
+    return {
+        name: _sample_value(name, field.annotation, items, index)
+        for name, field in schema.model_fields.items()
+    }
+
+
+def sample_payload(document_type: str, items: int = 10) -> dict:
+    """A validated payload for ``document_type`` with ``items`` rows."""
+    doc_type = get_document_type(document_type)
+    if doc_type is None:
+        raise ValueError(f"Unknown document type: {document_type}")
+    payload = _sample_model(doc_type.schema, items)
+    return doc_type.schema(**payload).model_dump()
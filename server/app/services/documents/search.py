@@ -0,0 +1,40 @@
+"""
+Index-backed lookups inside document content.
+
+Content is JSONB with a ``jsonb_path_ops`` GIN index, so every filter here
+is expressed as a containment (``@>``) predicate the index can answer -
+e.g. "an item whose part_no is X" becomes ``data @> '{"items": [{"part_no": "X"}]}'``.
+"""
+from sqlalchemy import or_
+
+from app.models.document_content import DocumentContent
+
+# Search field -> line item keys it matches across the document schemas
+LINE_ITEM_FIELDS = {
+    "part_no": ("part_no", "part_number"),
+    "sap_number": ("sap_number",),
+    "batch_no": ("batch_no",),
+    "serial_no": ("serial_no",),
+}
+
+# Search field -> top-level document keys it matches
+HEADER_FIELDS = {
+    "shipment_no": ("shipment_no",),
+}
+
+
+def content_filters(**values):
+    """Containment predicates on DocumentContent.data for the given non-empty values."""
+    filters = []
+    for field, value in values.items():
+        if not value:
+            continue
+        if field in LINE_ITEM_FIELDS:
+            keys = LINE_ITEM_FIELDS[field]
+            filters.append(or_(*[DocumentContent.data.contains({"items": [{key: value}]}) for key in keys]))
+        elif field in HEADER_FIELDS:
+            keys = HEADER_FIELDS[field]
+            filters.append(or_(*[DocumentContent.data.contains({key: value}) for key in keys]))
+        else:
+            raise ValueError(f"Unknown search field: {field}")
+    return filters
@@ -0,0 +1,2 @@
+# Asynchronous PDF rendering: a database-backed job queue (jobs.py)
+# drained by separate worker processes (worker.py).
@@ -0,0 +1,171 @@
+"""
+Database-backed queue of PDF render jobs.
+
+Jobs are rows in ``render_jobs``. Workers claim the oldest runnable job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of worker processes can
+drain the same table without an external broker and without claiming a job
+twice. Failed jobs are retried with exponential backoff. Workers abort a
+render that runs past ``JOB_TIMEOUT``; jobs whose worker died are put back
+on the queue a little after that. A worker only records the outcome of an
+attempt while the job is still its own (same worker and attempt number),
+so a worker that lost its job to the sweep cannot overwrite the new attempt.
+
+Configuration (environment):
+    RENDER_JOB_MAX_ATTEMPTS     attempts before a job is marked FAILED
+    RENDER_JOB_RETRY_BACKOFF    base delay in seconds between attempts
+    RENDER_JOB_TIMEOUT          seconds a render may take before it is aborted
+"""
+import datetime as dt
+import os
+import uuid
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.document import TicketDocument
+from app.models.render_job import RenderJob, RenderJobStatus
+from app.services.documents.pdf_cache import pdf_cache
+from app.services.documents.rendering import document_cache_key, is_landscape
+
+MAX_ATTEMPTS = int(os.getenv("RENDER_JOB_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF = float(os.getenv("RENDER_JOB_RETRY_BACKOFF", "5"))
+JOB_TIMEOUT = float(os.getenv("RENDER_JOB_TIMEOUT", "180"))
+# Time a worker gets to record the outcome of a render cut off at JOB_TIMEOUT
+LEASE_GRACE = 30
+
+
+def submit_job(db: Session, db_doc: TicketDocument, data: dict) -> RenderJob:
+    """Queue a render of ``db_doc`` with its current ``data``."""
+    landscape = is_landscape(db_doc.document_type)
+    job = RenderJob(
+        job_id=str(uuid.uuid4()),
+        document_id=db_doc.id,
+        template_name=db_doc.template_name,
+        landscape=landscape,
+        payload=data,
+        cache_key=document_cache_key(db_doc.template_name, data, landscape),
+        max_attempts=MAX_ATTEMPTS,
+    )
+    # Nothing to do if this exact rendering is already cached
+    if pdf_cache.get(job.cache_key):
+        job.status = RenderJobStatus.DONE
+        job.finished_at = func.now()
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_job(db: Session, worker: str) -> Optional[RenderJob]:
+    """Take the oldest runnable job for ``worker``, or None if the queue is empty."""
+    job = (
+        db.query(RenderJob)
+        .filter(RenderJob.status == RenderJobStatus.QUEUED, RenderJob.run_after <= func.now())
+        .order_by(RenderJob.run_after, RenderJob.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = RenderJobStatus.RUNNING
+    job.attempts += 1
+    job.worker = worker
+    job.started_at = func.now()
+    db.commit()
+    return job
+
+
+def _lease(job_id: int, worker: str, attempt: int) -> tuple:
+    # Matches the job only while it is still this worker's current attempt
+    return (
+        RenderJob.id == job_id,
+        RenderJob.status == RenderJobStatus.RUNNING,
+        RenderJob.worker == worker,
+        RenderJob.attempts == attempt,
+    )
+
+
+def complete_job(db: Session, job_id: int, worker: str, attempt: int) -> bool:
+    """
+    Mark ``worker``'s ``attempt`` at the job DONE. Returns False if it lost
+    the lease (the job was requeued meanwhile) and nothing was changed.
+    """
+    updated = (
+        db.query(RenderJob)
+        .filter(*_lease(job_id, worker, attempt))
+        .update({"status": RenderJobStatus.DONE, "error": None, "finished_at": func.now()},
+                synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
+
+def fail_job(db: Session, job_id: int, worker: str, attempt: int, max_attempts: int, error: str) -> bool:
+    """
+    Schedule a retry, or mark the job FAILED once it is out of attempts.
+    Returns False if ``worker`` lost the lease and nothing was changed.
+    """
+    if attempt < max_attempts:
+        values = {
+            "status": RenderJobStatus.QUEUED,
+            "run_after": func.now() + dt.timedelta(seconds=RETRY_BACKOFF * 2 ** (attempt - 1)),
+        }
+    else:
+        values = {"status": RenderJobStatus.FAILED, "finished_at": func.now()}
+    updated = (
+        db.query(RenderJob)
+        .filter(*_lease(job_id, worker, attempt))
+        .update({"error": error[:2000], **values}, synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """
+    Recover RUNNING jobs whose worker died: a live worker gives up on its
+    render after ``JOB_TIMEOUT``, so anything older than that plus
+    ``LEASE_GRACE`` has nobody working on it.
+    """
+    stale = (
+        RenderJob.status == RenderJobStatus.RUNNING,
+        RenderJob.started_at < func.now() - dt.timedelta(seconds=JOB_TIMEOUT + LEASE_GRACE),
+    )
+    error = f"Timed out after {int(JOB_TIMEOUT)}s"
+    failed = (
+        db.query(RenderJob)
+        .filter(*stale, RenderJob.attempts >= RenderJob.max_attempts)
+        .update({"status": RenderJobStatus.FAILED, "error": error, "finished_at": func.now()},
+                synchronize_session=False)
+    )
+    requeued = (
+        db.query(RenderJob)
+        .filter(*stale)
+        .update({"status": RenderJobStatus.QUEUED, "error": error, "run_after": func.now()},
+                synchronize_session=False)
+    )
+    db.commit()
+    return failed + requeued
+
+
+def queue_depth(db: Session) -> dict:
+    """Job counts per status plus the age of the oldest runnable job."""
+    counts = dict(
+        db.query(RenderJob.status, func.count(RenderJob.id))
+        .filter(RenderJob.status.in_([RenderJobStatus.QUEUED, RenderJobStatus.RUNNING]))
+        .group_by(RenderJob.status)
+        .all()
+    )
+    oldest = (
+        db.query(func.extract("epoch", func.now() - func.min(RenderJob.run_after)))
+        .filter(RenderJob.status == RenderJobStatus.QUEUED, RenderJob.run_after <= func.now())
+        .scalar()
+    )
+    return {
+        "queued": counts.get(RenderJobStatus.QUEUED, 0),
+        "running": counts.get(RenderJobStatus.RUNNING, 0),
+        "oldest_queued_seconds": round(float(oldest), 1) if oldest is not None else 0.0,
+    }
@@ -0,0 +1,167 @@
+"""
+Render worker processes.
+
+Runs a small supervisor that keeps ``--workers`` processes alive. Each
+process owns its own warm browser pool and a database session, and loops
+claiming jobs from ``render_jobs``; finished PDFs are written to the shared
+PDF cache, from where the API serves them.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.services.render_jobs.worker --workers 2
+
+Configuration (environment):
+    RENDER_WORKERS              worker processes started by default
+    RENDER_WORKER_BROWSERS      browsers per worker process
+    RENDER_JOB_POLL_INTERVAL    seconds to sleep when the queue is empty
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from contextlib import contextmanager
+
+from app.core.database import SessionLocal
+from app.services.documents.browser_pool import browser_pool
+from app.services.documents.rendering import render_document
+from app.services.render_jobs.jobs import JOB_TIMEOUT, claim_job, complete_job, fail_job, requeue_stale_jobs
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(processName)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+WORKER_BROWSERS = int(os.getenv("RENDER_WORKER_BROWSERS", "1"))
+POLL_INTERVAL = float(os.getenv("RENDER_JOB_POLL_INTERVAL", "1"))
+REAP_INTERVAL = 30
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Raise RenderTimeout in the main thread after ``seconds``. In-process
+    backends (xhtml2pdf) have no time limit of their own, and a worker
+    process renders one job at a time on its main thread.
+    """
+    def expire(signum, frame):
+        raise RenderTimeout(f"Render took longer than {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def process_next_job(db, worker: str) -> bool:
+    """Claim and render one job. Returns False when the queue was empty."""
+    job = claim_job(db, worker)
+    if job is None:
+        return False
+    # Read the lease now: the job's attributes would reload from the database
+    # later, possibly as another worker's attempt. Don't hold a transaction open
+    # during the render.
+    job_id, name, attempt, max_attempts = job.id, job.job_id, job.attempts, job.max_attempts
+    template_name, payload, landscape, cache_key = job.template_name, job.payload, job.landscape, job.cache_key
+    db.commit()
+
+    try:
+        with deadline(JOB_TIMEOUT):
+            render_document(template_name, payload, landscape, key=cache_key)
+    except Exception as e:
+        logger.exception("Render job %s failed (attempt %d)", name, attempt)
+        db.rollback()
+        recorded = fail_job(db, job_id, worker, attempt, max_attempts, f"{type(e).__name__}: {e}")
+    else:
+        recorded = complete_job(db, job_id, worker, attempt)
+        if recorded:
+            logger.info("Render job %s done", name)
+    if not recorded:
+        logger.warning("Render job %s was requeued while attempt %d ran; result dropped", name, attempt)
+    return True
+
+
+def run_worker(name: str) -> None:
+    """Main loop of one worker process."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    browser_pool.size = WORKER_BROWSERS
+    browser_pool.start()
+    db = SessionLocal()
+    last_reap = 0.0
+    try:
+        while not stopping:
+            try:
+                if time.monotonic() - last_reap > REAP_INTERVAL:
+                    recovered = requeue_stale_jobs(db)
+                    if recovered:
+                        logger.warning("Recovered %d stale render job(s)", recovered)
+                    last_reap = time.monotonic()
+                if not process_next_job(db, name):
+                    time.sleep(POLL_INTERVAL)
+            except Exception:
+                # Lost DB connection etc. - back off and keep the worker alive
+                logger.exception("Render worker loop error")
+                db.rollback()
+                time.sleep(POLL_INTERVAL)
+    finally:
+        db.close()
+        browser_pool.stop()
+
+
+def main(workers: int = RENDER_WORKERS) -> None:
+    """Start ``workers`` processes and restart any that exit unexpectedly."""
+    ctx = multiprocessing.get_context("spawn")
+    host = socket.gethostname()
+    processes = {}
+    stopping = False
+
+    def spawn(index: int):
+        name = f"render-worker-{index}"
+        process = ctx.Process(target=run_worker, args=(f"{host}:{name}",), name=name)
+        process.start()
+        processes[index] = process
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+    logger.info("Started %d render worker(s)", workers)
+
+    while not stopping:
+        time.sleep(1)
+        for index, process in list(processes.items()):
+            if not process.is_alive() and not stopping:
+                logger.warning("%s exited with code %s, restarting", process.name, process.exitcode)
+                spawn(index)
+
+    for process in processes.values():
+        process.terminate()
+    for process in processes.values():
+        process.join(30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run PDF render worker processes")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS, help="number of worker processes")
+    args = parser.parse_args()
+    main(args.workers)
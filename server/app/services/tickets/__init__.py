@@ -0,0 +1 @@
+# Ticket business rules shared by the ticket, comment and document endpoints.
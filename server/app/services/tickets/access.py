@@ -0,0 +1,34 @@
+"""
+Role-based visibility of tickets.
+
+UNIT users see the tickets they raised, TEAM users the tickets allocated to
+their team, and G1/ADMIN users see everything.
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Query
+
+from app.models.ticket import Ticket
+from app.models.user import User, UserRole
+
+
+def scope_tickets(query: Query, user: User) -> Optional[Query]:
+    """
+    Restrict a query that selects from ``tickets`` to what ``user`` may see.
+    Returns None when the user can see no tickets at all.
+    """
+    if user.role == UserRole.UNIT:
+        return query.filter(Ticket.created_by_id == user.id)
+    if user.role == UserRole.TEAM:
+        if not user.team_id:
+            return None
+        return query.filter(Ticket.assigned_team_id == user.team_id)
+    return query
+
+
+def can_view_ticket(ticket: Ticket, user: User) -> bool:
+    if user.role == UserRole.UNIT:
+        return ticket.created_by_id == user.id
+    if user.role == UserRole.TEAM:
+        return ticket.assigned_team_id == user.team_id
+    return True
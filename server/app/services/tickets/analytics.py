@@ -0,0 +1,125 @@
+"""
+Ticket lifecycle analytics.
+
+Every ticket has a ``ticket_metrics`` row. ``create_ticket`` starts it and
+``record_transition`` updates it in the same transaction as each transition,
+with one ``UPDATE`` that adds the time spent in the state being left to that
+state's total. Time-to-allocate, time-to-resolve and the reopen count are
+filled in the same way, so ``history`` never has to be replayed.
+
+``lifecycle_report`` aggregates the rows - percentiles of the durations and
+averages of the time in each state - grouped by team, priority and/or
+period of creation.
+"""
+import datetime as dt
+from typing import List, Optional
+
+from sqlalchemy import Integer, cast, extract, func, update
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_metrics import TicketMetrics
+
+# Total time spent in each state; CLOSED is final
+STATE_SECONDS = {
+    TicketStatus.OPEN: TicketMetrics.open_seconds,
+    TicketStatus.ALLOCATED: TicketMetrics.allocated_seconds,
+    TicketStatus.RESOLVED: TicketMetrics.resolved_seconds,
+}
+REOPEN_EVENTS = ("REALLOCATED_TO_SAME_TEAM", "REALLOCATED_TO_G1")
+
+GROUPS = {
+    "team": TicketMetrics.team_id,
+    "priority": TicketMetrics.priority,
+}
+PERIODS = ("day", "week", "month")
+
+
+def _seconds_since(column):
+    return cast(extract("epoch", func.now() - column), Integer)
+
+
+def start_metrics(db: Session, ticket: Ticket) -> None:
+    """Queue the metrics row of a new ticket; it is inserted with the ticket."""
+    db.add(TicketMetrics(
+        ticket=ticket,
+        team_id=ticket.assigned_team_id,
+        priority=ticket.priority or TicketPriority.MEDIUM,
+        created_at=func.now(),
+        state=ticket.status or TicketStatus.OPEN,
+        state_since=func.now(),
+        reopen_count=0,
+    ))
+
+
+def record_transition(db: Session, ticket: Ticket, old_status: TicketStatus, event: str) -> None:
+    """Account for ``ticket`` having just moved from ``old_status``; does not commit."""
+    values = {
+        "state": ticket.status,
+        "state_since": func.now(),
+        "priority": ticket.priority,
+        "team_id": func.coalesce(ticket.assigned_team_id, TicketMetrics.team_id),
+    }
+    if old_status in STATE_SECONDS:
+        column = STATE_SECONDS[old_status]
+        values[column.key] = column + _seconds_since(TicketMetrics.state_since)
+    if event == "ALLOCATED":
+        values["allocate_seconds"] = func.coalesce(
+            TicketMetrics.allocate_seconds, _seconds_since(TicketMetrics.created_at)
+        )
+    if ticket.status == TicketStatus.CLOSED:
+        values["resolve_seconds"] = _seconds_since(TicketMetrics.created_at)
+    if event in REOPEN_EVENTS:
+        values["reopen_count"] = TicketMetrics.reopen_count + 1
+
+    db.execute(
+        update(TicketMetrics).where(TicketMetrics.ticket_id == ticket.id).values(**values),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def lifecycle_report(
+    db: Session,
+    group_by: List[str],
+    period: Optional[str],
+    since: dt.datetime,
+    until: dt.datetime,
+    team_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    One row per group of tickets created in [``since``, ``until``): the
+    ticket count, 50th/90th percentiles of time-to-allocate and
+    time-to-resolve, reopens, and the average completed time in each state.
+    Raises ValueError for an unknown group or period.
+    """
+    unknown = [name for name in group_by if name not in GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown group: {', '.join(unknown)}")
+    if period is not None and period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+
+    keys = [GROUPS[name].label(name) for name in group_by]
+    if period is not None:
+        keys.append(func.date_trunc(period, TicketMetrics.created_at).label("period"))
+
+    def percentile(column, fraction):
+        return func.percentile_cont(fraction).within_group(column)
+
+    query = db.query(
+        *keys,
+        func.count().label("tickets"),
+        percentile(TicketMetrics.allocate_seconds, 0.5).label("allocate_p50"),
+        percentile(TicketMetrics.allocate_seconds, 0.9).label("allocate_p90"),
+        percentile(TicketMetrics.resolve_seconds, 0.5).label("resolve_p50"),
+        percentile(TicketMetrics.resolve_seconds, 0.9).label("resolve_p90"),
+        func.coalesce(func.sum(TicketMetrics.reopen_count), 0).label("reopens"),
+        func.count().filter(TicketMetrics.reopen_count > 0).label("reopened_tickets"),
+        func.avg(TicketMetrics.open_seconds).label("open_avg"),
+        func.avg(TicketMetrics.allocated_seconds).label("allocated_avg"),
+        func.avg(TicketMetrics.resolved_seconds).label("resolved_avg"),
+    ).filter(TicketMetrics.created_at >= since, TicketMetrics.created_at < until)
+    if team_id is not None:
+        query = query.filter(TicketMetrics.team_id == team_id)
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+    return [dict(row._mapping) for row in query.all()]
@@ -0,0 +1,173 @@
+"""
+Bulk ticket import.
+
+Rows (CSV with a header line, or NDJSON) are validated one by one with
+``TicketCreate``; invalid rows are reported with their line number and
+skipped. Valid rows are written with ``COPY`` into a temporary staging
+table, ``IMPORT_BATCH_SIZE`` rows at a time, so memory does not grow with
+the file. A single statement then inserts the tickets together with their
+CREATED history events, lifecycle metrics and dashboard counters, and the
+whole import commits once.
+
+G1 notifications are optional: one summary notification per G1 user,
+inserted in one statement, instead of one per ticket and user.
+"""
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from typing import IO, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.user import User, UserRole
+from app.schemas.ticket import TicketCreate
+from app.services.tickets.notifications import notify_users
+
+IMPORT_BATCH_SIZE = int(os.getenv("TICKET_IMPORT_BATCH_SIZE", "5000"))
+# Stop collecting row errors after this many; the count keeps going
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("csv", "ndjson")
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """(line number, raw row) pairs; a row that cannot be parsed is a ValueError instance."""
+    if fmt == "csv":
+        # Strict, so stray quotes are reported instead of read into the field
+        reader = csv.DictReader(stream, strict=True)
+        while True:
+            start = reader.line_num + 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # Reported at the line the bad record starts on; reading resumes after it
+                yield start, ValueError(f"Invalid CSV: {e}")
+                continue
+            yield reader.line_num, row
+    elif fmt == "ndjson":
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, ValueError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _copy_batch(db: Session, rows: List[list]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert("COPY ticket_import (line, title, description, priority) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+# Tickets, their CREATED events, metrics and counters, from the staged rows
+INSERT_STAGED = text("""
+    WITH new AS (
+        INSERT INTO tickets (title, description, priority, status, created_by_id, version)
+        SELECT title, description, priority::ticketpriority, 'OPEN', :created_by_id, 1
+        FROM ticket_import
+        ORDER BY line
+        RETURNING id, priority, created_at
+    ), events AS (
+        INSERT INTO ticket_events (ticket_id, event, actor, role, notes)
+        SELECT id, 'CREATED', :actor, :role, 'Bulk import' FROM new
+    ), metrics AS (
+        INSERT INTO ticket_metrics (ticket_id, priority, created_at, state, state_since, reopen_count,
+                                    open_seconds, allocated_seconds, resolved_seconds)
+        SELECT id, priority, created_at, 'OPEN', created_at, 0, 0, 0, 0 FROM new
+    ), stats AS (
+        INSERT INTO ticket_stats (status, priority, team_id, count)
+        SELECT 'OPEN', priority, 0, count(*) FROM new GROUP BY priority
+        ON CONFLICT (status, priority, team_id) DO UPDATE SET count = ticket_stats.count + excluded.count
+    )
+    SELECT count(*) FROM new
+""")
+
+def import_tickets(
+    db: Session,
+    stream: IO[str],
+    fmt: str,
+    creator: User,
+    actor: User,
+    notify: bool = False,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Import the tickets in ``stream`` as raised by ``creator``, recording
+    ``actor`` in their history. With ``dry_run`` rows are only validated.
+    Raises ValueError for an unknown format.
+    """
+    report = ImportReport()
+    if not dry_run:
+        db.execute(text(
+            "CREATE TEMP TABLE ticket_import (line integer, title text, description text, priority text) "
+            "ON COMMIT DROP"
+        ))
+
+    batch: List[list] = []
+    for line, raw in read_rows(stream, fmt):
+        if isinstance(raw, ValueError):
+            report.add_error(line, str(raw))
+            continue
+        if not isinstance(raw, dict):
+            report.add_error(line, "Expected an object")
+            continue
+        try:
+            ticket = TicketCreate.model_validate({key: value for key, value in raw.items() if value not in (None, "")})
+        except ValidationError as e:
+            report.add_error(line, _validation_message(e))
+            continue
+        if "\x00" in ticket.title or "\x00" in ticket.description:
+            # COPY would reject the whole batch
+            report.add_error(line, "NUL characters are not allowed")
+            continue
+        report.imported += 1
+        if not dry_run:
+            batch.append([line, ticket.title, ticket.description, ticket.priority.value])
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _copy_batch(db, batch)
+                batch = []
+
+    if dry_run:
+        return report
+    if batch:
+        _copy_batch(db, batch)
+
+    report.imported = db.execute(INSERT_STAGED, {
+        "created_by_id": creator.id, "actor": actor.full_name, "role": actor.role.value,
+    }).scalar()
+    if notify and report.imported:
+        notify_users(db, [(User.role == UserRole.G1, f"{report.imported} tickets imported for {creator.full_name}")])
+    db.commit()
+    return report
@@ -0,0 +1,85 @@
+"""
+Ticket change feed.
+
+Every write to a ticket records the writing transaction's ID in
+``tickets.change_xid``: creating, updating or transitioning it, and -
+through database triggers - adding history, a document or a comment.
+``changes_since`` walks ``ix_tickets_change_xid`` from a cursor, so a poll
+reads only the tickets that changed, however many there are in total.
+
+Transaction IDs are handed out when a transaction first writes, not when it
+commits, so a poll stops short of the oldest transaction that is still
+running: ``pg_snapshot_xmin`` of the current snapshot. Every ID below it
+has committed or rolled back, so the cursor never moves past a change that
+is not visible yet. Transactions that only read - idle sessions, export
+streams, the stats reconciler's snapshot - have no ID and do not hold the
+feed back.
+
+Limits:
+
+- A long transaction that has written anything holds every user's feed
+  back until it ends. Transaction IDs are shared by the whole server, so
+  this includes writers in other databases and prepared transactions.
+- Cursors are transaction IDs of this server. After restoring a dump into
+  another server, clients must start over without a cursor.
+- A ticket reallocated away from a team stops appearing in that team's feed.
+"""
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services.tickets.access import scope_tickets
+from app.services.tickets.loading import with_response_loading
+from app.services.tickets.pagination import InvalidCursor
+
+# Oldest transaction ID still running; every lower ID has ended
+SETTLED = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+FEED_ORDER = (Ticket.change_xid, Ticket.id)
+
+
+def encode_cursor(change_xid: int, ticket_id: int) -> str:
+    raw = json.dumps({"x": change_xid, "i": ticket_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(payload["x"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def feed_page(query: Query, after: Optional[Tuple[int, int]], before: int, limit: int) -> Query:
+    """Tickets of ``query`` changed after ``after`` by transactions below ``before``, in change order."""
+    query = query.filter(Ticket.change_xid < before)
+    if after is not None:
+        query = query.filter(tuple_(*FEED_ORDER) > tuple_(*after))
+    return query.order_by(*FEED_ORDER).limit(limit)
+
+
+def changes_since(db: Session, user: User, since: Optional[str], limit: int) -> Tuple[List[Ticket], str, bool]:
+    """
+    The tickets ``user`` may see that changed after ``since`` (from the
+    beginning when empty), the cursor to poll with next, and whether more
+    changes are already waiting. Raises InvalidCursor for a malformed cursor.
+    """
+    after = decode_cursor(since) if since else None
+    settled = db.execute(SETTLED).scalar()
+
+    query = scope_tickets(db.query(Ticket), user)
+    if query is None:
+        return [], since or encode_cursor(settled, 0), False
+
+    rows = with_response_loading(feed_page(query, after, settled, limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].change_xid, rows[-1].id), True
+    # Caught up: nothing below ``settled`` is left, and no transaction below it can still commit
+    return rows, encode_cursor(settled, 0), False
@@ -0,0 +1,71 @@
+"""
+Streaming ticket exports.
+
+Rows are read through a server-side cursor ``EXPORT_BATCH_SIZE`` at a time
+and each batch is encoded and yielded as soon as it arrives, so memory use
+does not grow with the export and the first bytes (the CSV header) go out
+before the query has even run. Only plain columns are selected - no ORM
+entities, relationships or Pydantic models.
+
+The generator runs after the endpoint has returned, when the request's
+session is already closed, so it opens a session of its own.
+"""
+import csv
+import datetime as dt
+import enum
+import io
+import json
+import os
+from typing import Iterator, List
+
+from sqlalchemy.sql import Select
+
+from app.core.database import SessionLocal
+
+EXPORT_BATCH_SIZE = int(os.getenv("TICKET_EXPORT_BATCH_SIZE", "2000"))
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, names: List[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else _plain(value) for value in row])
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(rows, names: List[str]) -> bytes:
+    return "".join(
+        json.dumps({name: _plain(value) for name, value in zip(names, row)}) + "\n" for row in rows
+    ).encode()
+
+
+def stream_export(statement: Select, names: List[str], fmt: str) -> Iterator[bytes]:
+    """Yield ``statement``'s rows (columns ``names``) encoded as ``fmt``, batch by batch."""
+    if fmt == "csv":
+        yield _encode_csv([names], names)
+        encode = _encode_csv
+    else:
+        encode = _encode_ndjson
+
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            statement, execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE}
+        )
+        for rows in result.partitions():
+            yield encode(rows, names)
+    finally:
+        db.close()
@@ -0,0 +1,66 @@
+"""
+Sparse fieldsets for ticket listings.
+
+``?fields=id,title,status`` (or ``view=summary``) selects just those columns
+in SQL and returns plain rows, skipping the ORM entities and every
+relationship load that the full ``Ticket`` response needs.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Query, Session
+
+from app.models.team import Team
+from app.models.ticket import Ticket
+
+FIELD_COLUMNS = {
+    "id": Ticket.id,
+    "title": Ticket.title,
+    "description": Ticket.description,
+    "status": Ticket.status,
+    "priority": Ticket.priority,
+    "created_by_id": Ticket.created_by_id,
+    "assigned_team_id": Ticket.assigned_team_id,
+    "resolved_by_id": Ticket.resolved_by_id,
+    "resolution_notes": Ticket.resolution_notes,
+    "created_at": Ticket.created_at,
+    "updated_at": Ticket.updated_at,
+    "version": Ticket.version,
+    "team_name": Team.name,
+}
+
+VIEWS = {
+    "full": None,
+    "summary": ["id", "title", "status", "priority", "team_name", "created_at"],
+}
+
+
+def parse_fields(fields: Optional[str], view: str) -> Optional[List[str]]:
+    """
+    The requested field names, or None for the full response. Raises
+    ValueError for an unknown view or field.
+    """
+    if fields:
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return names
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    return VIEWS[view]
+
+
+def sparse_query(db: Session, names: List[str], extra: List[str] = ()) -> Query:
+    """
+    Select ``names`` (plus ``extra``, e.g. the pagination keys) from
+    ``tickets``, joining ``teams`` only when the team name is wanted.
+    """
+    selected = list(dict.fromkeys([*names, *extra]))
+    query = db.query(*(FIELD_COLUMNS[name].label(name) for name in selected)).select_from(Ticket)
+    if "team_name" in selected:
+        query = query.outerjoin(Team, Ticket.assigned_team_id == Team.id)
+    return query
+
+
+def row_to_dict(row, names: List[str]) -> Dict:
+    return {name: getattr(row, name) for name in names}
@@ -0,0 +1,59 @@
+"""
+Validators for conditional ticket reads.
+
+A ticket response changes only when the ticket's ``version`` or
+``updated_at`` does: transitions and edits bump both, and database triggers
+move ``updated_at`` when history or documents are added. ``ticket_state``
+reads them, plus what the permission check needs, by primary key, so an
+unchanged ticket is answered without loading and serializing it.
+
+A listing is summarized over every ticket in the caller's scope: the row
+count (which catches tickets leaving the scope), the newest ``updated_at``
+and the sum of versions.
+
+Renaming a creator, resolver or team does not change the validators.
+"""
+import hashlib
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session
+
+from app.models.ticket import Ticket
+
+
+def _stamp(value) -> str:
+    return f"{value.timestamp():.6f}" if value is not None else "0"
+
+
+def ticket_validator(ticket) -> str:
+    """
+    Opaque validator of a ticket's response, from a ``Ticket`` or a
+    ``ticket_state`` row; starts with ``ticket-{id}-v{version}``.
+    """
+    return f"ticket-{ticket.id}-v{ticket.version}-{_stamp(ticket.updated_at)}"
+
+
+def ticket_state(db: Session, ticket_id: int) -> Optional[Row]:
+    """
+    The ticket's scope columns and validator inputs, or None if it does not
+    exist. The row can be passed to ``can_view_ticket``.
+    """
+    return db.execute(
+        select(Ticket.id, Ticket.created_by_id, Ticket.assigned_team_id, Ticket.version, Ticket.updated_at)
+        .where(Ticket.id == ticket_id)
+    ).first()
+
+
+def listing_validator(query: Query, variant: str = "") -> str:
+    """
+    Opaque validator of a listing over the tickets ``query`` selects (already
+    scoped and filtered). ``variant`` distinguishes listings of the same
+    tickets that render differently, such as other pages or fields.
+    """
+    count, last_change, versions = query.with_entities(
+        func.count(Ticket.id), func.max(Ticket.updated_at), func.sum(Ticket.version)
+    ).one()
+    state = f"{variant}|{count}|{_stamp(last_change)}|{versions or 0}"
+    return "tickets-" + hashlib.sha1(state.encode()).hexdigest()
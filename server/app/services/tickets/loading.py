@@ -0,0 +1,41 @@
+"""
+Loader strategies for ticket responses.
+
+The ``Ticket`` response schema nests the creator, assigned team, resolver,
+documents and history. Loading them lazily costs one query per ticket and
+relationship; these options fetch the to-one relationships in the same
+query and each collection in one extra query, so an endpoint runs the same
+number of queries however many tickets it returns.
+
+Collections use ``subqueryload`` rather than ``selectinload``: the latter
+splits its IN list into batches of 500 parents, so a 1000-row page would
+cost extra round trips. The subquery repeats the parent query, which
+therefore needs a deterministic ORDER BY when it is limited.
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Query, Session, joinedload, subqueryload
+
+from app.models.ticket import Ticket
+
+TICKET_RESPONSE_OPTIONS = (
+    joinedload(Ticket.creator),
+    joinedload(Ticket.assigned_team),
+    joinedload(Ticket.resolver),
+    subqueryload(Ticket.documents),
+    subqueryload(Ticket.events),
+)
+
+
+def with_response_loading(query: Query) -> Query:
+    return query.options(*TICKET_RESPONSE_OPTIONS)
+
+
+def load_ticket(db: Session, ticket_id: int) -> Optional[Ticket]:
+    """Fetch a ticket with everything its response serializes."""
+    return (
+        with_response_loading(db.query(Ticket))
+        .filter(Ticket.id == ticket_id)
+        .populate_existing()
+        .first()
+    )
@@ -0,0 +1,40 @@
+"""
+Notification fan-out.
+
+Recipients are described as conditions on ``User`` rather than loaded:
+``notify_users`` turns each (condition, message) pair into a ``SELECT`` over
+``users`` and inserts every notification with one ``INSERT ... SELECT``.
+The cost is one statement however many users match, and nothing is
+committed, so the notifications belong to the caller's transaction.
+"""
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification
+from app.models.user import User
+
+# (condition on User, message) pairs; every user matching a condition is notified
+Recipients = Iterable[Tuple[object, str]]
+
+
+def notify_users(db: Session, recipients: Recipients, ticket_id: Optional[int] = None) -> int:
+    """
+    Queue a notification about ``ticket_id`` for every user matching each
+    condition of ``recipients``; returns how many were inserted. A user
+    matching two conditions gets both messages - combine conditions with
+    ``or_`` for one message per user.
+    """
+    selects = [
+        select(User.id, literal(ticket_id, Integer), literal(message), literal(False)).where(condition)
+        for condition, message in recipients
+    ]
+    if not selects:
+        return 0
+    return db.execute(
+        insert(Notification).from_select(
+            ["recipient_id", "ticket_id", "message", "is_read"],
+            selects[0] if len(selects) == 1 else union_all(*selects),
+        )
+    ).rowcount
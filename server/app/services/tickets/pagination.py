@@ -0,0 +1,81 @@
+"""
+Keyset (cursor) pagination of ticket listings.
+
+Pages are ordered newest first on one of the ``SORT_KEYS`` column lists,
+always ending in ``id`` so the order is total. A cursor encodes the sort key
+values of the last row returned; the next page continues strictly after it
+with a row-value comparison, so deep pages cost the same as the first and
+rows are neither skipped nor repeated while tickets change.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON document.
+"""
+import base64
+import datetime as dt
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app.models.ticket import Ticket, TicketPriority
+
+SORT_KEYS = {
+    "created": (Ticket.created_at, Ticket.id),
+    "priority": (Ticket.priority, Ticket.created_at, Ticket.id),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _dump(value):
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    if isinstance(value, TicketPriority):
+        return value.value
+    return value
+
+
+def _load(column, value):
+    if column is Ticket.created_at:
+        return dt.datetime.fromisoformat(value)
+    if column is Ticket.priority:
+        return TicketPriority(value)
+    return int(value)
+
+
+def encode_cursor(sort: str, ticket: Ticket) -> str:
+    values = [_dump(getattr(ticket, column.key)) for column in SORT_KEYS[sort]]
+    raw = json.dumps({"s": sort, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        columns = SORT_KEYS[sort]
+        if payload["s"] != sort or len(payload["v"]) != len(columns):
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        return tuple(_load(column, value) for column, value in zip(columns, payload["v"]))
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def paginate(query: Query, sort: str, cursor: Optional[str], limit: int) -> Tuple[List[Ticket], Optional[str]]:
+    """
+    Return one page of ``query`` and the cursor of the next page (None on
+    the last page). An empty ``cursor`` starts from the beginning.
+    """
+    columns = SORT_KEYS[sort]
+    if cursor:
+        query = query.filter(tuple_(*columns) < tuple_(*decode_cursor(sort, cursor)))
+
+    rows = query.order_by(*(column.desc() for column in columns)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, rows[-1])
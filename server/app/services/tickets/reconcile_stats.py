@@ -0,0 +1,70 @@
+"""
+Periodic reconciliation of the ticket counters.
+
+Recounts ``tickets`` every ``--interval`` seconds and corrects any cell of
+``ticket_stats`` that has drifted (see ``app.services.tickets.stats``).
+
+Usage (via Docker):
+    docker compose exec backend python -m app.services.tickets.reconcile_stats --once
+
+Configuration (environment):
+    TICKET_STATS_RECONCILE_INTERVAL    seconds between runs
+"""
+import argparse
+import logging
+import os
+import signal
+import time
+
+from app.core.database import SessionLocal
+from app.services.tickets.stats import reconcile
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL = float(os.getenv("TICKET_STATS_RECONCILE_INTERVAL", "300"))
+
+
+def run_once() -> None:
+    db = SessionLocal()
+    try:
+        corrected = reconcile(db)
+        if corrected:
+            logger.warning("Corrected %d drifted ticket counter(s)", corrected)
+        else:
+            logger.info("Ticket counters are in sync")
+    finally:
+        db.close()
+
+
+def main(interval: float = RECONCILE_INTERVAL) -> None:
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    next_run = 0.0
+    while not stopping:
+        if time.monotonic() >= next_run:
+            try:
+                run_once()
+            except Exception:
+                # Lost DB connection etc. - try again next interval
+                logger.exception("Ticket counter reconciliation failed")
+            next_run = time.monotonic() + interval
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile ticket counters with the tickets table")
+    parser.add_argument("--interval", type=float, default=RECONCILE_INTERVAL, help="seconds between runs")
+    parser.add_argument("--once", action="store_true", help="reconcile once and exit")
+    args = parser.parse_args()
+    if args.once:
+        run_once()
+    else:
+        main(args.interval)
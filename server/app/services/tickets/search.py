@@ -0,0 +1,72 @@
+"""
+Ticket search.
+
+Full-text search runs against ``tickets.search_vector``, a tsvector kept up
+to date by database triggers from the title (weight A), description (B),
+resolution notes (C) and comment text (D), and is ranked with
+``ts_rank_cd``. When that finds nothing - typically a typo or a partial
+word - a fuzzy pass matches word prefixes in the vector and trigram word
+similarity on the title.
+
+Both passes go through ``scope_tickets``, so users only find what they are
+allowed to list.
+"""
+import os
+import re
+from typing import List, Optional
+
+from sqlalchemy import func, literal, or_, text
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services.tickets.access import scope_tickets
+
+SEARCH_CONFIG = "english"
+# Minimum pg_trgm word similarity (0-1) for a fuzzy title match
+FUZZY_THRESHOLD = float(os.getenv("TICKET_SEARCH_FUZZY_THRESHOLD", "0.4"))
+
+RESULT_COLUMNS = (Ticket.id, Ticket.title, Ticket.status, Ticket.priority, Ticket.created_at)
+
+
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """``elev wir`` -> ``elev:* & wir:*``, built from word characters only."""
+    words = re.findall(r"\w+", q)
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+def _run(db: Session, user: User, match, rank, limit: int) -> List:
+    query = scope_tickets(
+        db.query(*RESULT_COLUMNS, rank.label("rank")).filter(match), user
+    )
+    if query is None:
+        return []
+    return query.order_by(rank.desc(), Ticket.created_at.desc(), Ticket.id.desc()).limit(limit).all()
+
+
+def search_tickets(db: Session, user: User, q: str, limit: int = 20) -> List[dict]:
+    """Ranked tickets matching ``q`` that ``user`` may see."""
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rows = _run(
+        db, user,
+        Ticket.search_vector.op("@@")(tsquery),
+        func.ts_rank_cd(Ticket.search_vector, tsquery),
+        limit,
+    )
+    if rows:
+        return [dict(row._mapping, match="fulltext") for row in rows]
+
+    prefix = _prefix_tsquery(q)
+    if prefix is None:
+        return []
+    prefix_query = func.to_tsquery(SEARCH_CONFIG, prefix)
+    # ``<%`` only uses the trigram index with the threshold set as a GUC
+    db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+               {"threshold": str(FUZZY_THRESHOLD)})
+    rows = _run(
+        db, user,
+        or_(Ticket.search_vector.op("@@")(prefix_query), literal(q).op("<%")(Ticket.title)),
+        func.greatest(func.word_similarity(q, Ticket.title), func.ts_rank_cd(Ticket.search_vector, prefix_query)),
+        limit,
+    )
+    return [dict(row._mapping, match="fuzzy") for row in rows]
@@ -0,0 +1,97 @@
+"""
+Ticket counters for dashboards.
+
+``ticket_stats`` holds one row per (status, priority, team) cell. Creating a
+ticket adds one to its cell and every transition moves one from the old cell
+to the new, in the same transaction as the ticket write, so reading the
+counts never touches ``tickets``.
+
+The increments are additive upserts, so concurrent writers never overwrite
+each other; rows are written in key order so two transactions cannot
+deadlock on them. ``reconcile`` corrects any drift left by writes that
+bypass the endpoints, such as seeding or manual SQL.
+"""
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_stat import TicketStat
+
+# ``team_id`` of the cell that counts unallocated tickets
+UNASSIGNED = 0
+
+StatKey = Tuple[TicketStatus, TicketPriority, int]
+
+
+def stat_key(status: TicketStatus, priority: TicketPriority, team_id) -> StatKey:
+    return (TicketStatus(status), TicketPriority(priority), team_id or UNASSIGNED)
+
+
+def ticket_key(ticket: Ticket) -> StatKey:
+    return stat_key(ticket.status, ticket.priority, ticket.assigned_team_id)
+
+
+def bump_stats(db: Session, changes: Dict[StatKey, int]) -> None:
+    """Add each delta to its cell in one statement; does not commit."""
+    rows = [
+        {"status": status, "priority": priority, "team_id": team_id, "count": delta}
+        for (status, priority, team_id), delta in sorted(changes.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(TicketStat).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[TicketStat.status, TicketStat.priority, TicketStat.team_id],
+        set_={"count": TicketStat.count + stmt.excluded.count},
+    ))
+
+
+def move_stats(db: Session, old: StatKey, new: StatKey) -> None:
+    """Count a ticket that moved from cell ``old`` to cell ``new``."""
+    changes = Counter({new: 1})
+    changes[old] -= 1
+    bump_stats(db, changes)
+
+
+def read_stats(db: Session, team_id: Optional[int] = None) -> Iterable[TicketStat]:
+    query = db.query(TicketStat).filter(TicketStat.count != 0)
+    if team_id is not None:
+        query = query.filter(TicketStat.team_id == team_id)
+    return query.order_by(TicketStat.team_id, TicketStat.status, TicketStat.priority).all()
+
+
+def reconcile(db: Session) -> int:
+    """
+    Bring the counters in line with ``tickets`` and return the number of
+    cells corrected. Counters and tickets are read from one snapshot, and
+    the difference is then applied as increments, so transitions committed
+    meanwhile are neither lost nor blocked.
+    """
+    snapshot = db.get_bind().connect().execution_options(isolation_level="REPEATABLE READ")
+    with snapshot, snapshot.begin():
+        actual = Counter({
+            stat_key(status, priority, team_id): count
+            for status, priority, team_id, count in snapshot.execute(
+                select(Ticket.status, Ticket.priority, Ticket.assigned_team_id, func.count())
+                .where(Ticket.status.isnot(None), Ticket.priority.isnot(None))
+                .group_by(Ticket.status, Ticket.priority, Ticket.assigned_team_id)
+            )
+        })
+        counted = {
+            stat_key(status, priority, team_id): count
+            for status, priority, team_id, count in snapshot.execute(
+                select(TicketStat.status, TicketStat.priority, TicketStat.team_id, TicketStat.count)
+            )
+        }
+
+    drift = {key: actual.get(key, 0) - counted.get(key, 0) for key in set(actual) | set(counted)}
+    drift = {key: delta for key, delta in drift.items() if delta}
+    bump_stats(db, drift)
+    db.query(TicketStat).filter(TicketStat.count == 0).delete(synchronize_session=False)
+    db.commit()
+    return len(drift)
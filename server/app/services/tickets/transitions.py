@@ -0,0 +1,126 @@
+"""
+Ticket status transitions.
+
+``TRANSITIONS`` is the ``TicketStatus`` state machine, keyed by the history
+event each transition records. ``apply_transition`` checks the move against
+it and writes everything in one transaction:
+
+- one ``UPDATE ... RETURNING`` sets the status and any other columns and
+  bumps ``version``. It only matches while the ticket still has the version
+  it was read with, so of two concurrent writers exactly one wins and the
+  other gets ``StaleTicket``;
+- one ``INSERT ... RETURNING`` adds the history event, looking up the team
+  name in the same statement;
+- one ``INSERT ... SELECT`` creates every notification, selecting the
+  recipients in the database instead of loading them first (see
+  ``notify_users``);
+- one upsert moves the ticket between its ``ticket_stats`` counters;
+- one ``UPDATE`` adds the time spent in the old status to the ticket's
+  ``ticket_metrics``;
+
+followed by a single commit.
+
+No ``SELECT ... FOR UPDATE`` is needed: the compare-and-swap ``UPDATE``
+takes the row lock itself, and holds it only for the two inserts until the
+commit. A competing ``UPDATE`` waits that long, re-checks the version and
+matches nothing. Comments and documents only move ``updated_at`` (see the
+``tickets_touch_from_children`` trigger), never ``version``, so they do not
+conflict with a transition.
+"""
+from typing import Callable, Dict, FrozenSet, NamedTuple, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.team import Team
+from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket_event import TicketEvent
+from app.models.user import User
+from app.services.tickets.analytics import record_transition
+from app.services.tickets.notifications import Recipients, notify_users
+from app.services.tickets.stats import move_stats, ticket_key
+
+
+class Transition(NamedTuple):
+    sources: FrozenSet[TicketStatus]
+    target: TicketStatus
+
+
+TRANSITIONS: Dict[str, Transition] = {
+    "ALLOCATED": Transition(frozenset({TicketStatus.OPEN, TicketStatus.ALLOCATED}), TicketStatus.ALLOCATED),
+    "MARKED_FOR_REVIEW": Transition(frozenset({TicketStatus.ALLOCATED}), TicketStatus.RESOLVED),
+    "APPROVED_AND_CLOSED": Transition(frozenset({TicketStatus.RESOLVED}), TicketStatus.CLOSED),
+    "REALLOCATED_TO_SAME_TEAM": Transition(frozenset({TicketStatus.RESOLVED}), TicketStatus.ALLOCATED),
+    "REALLOCATED_TO_G1": Transition(frozenset({TicketStatus.RESOLVED}), TicketStatus.OPEN),
+}
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class StaleTicket(ValueError):
+    """The ticket was changed by someone else after it was read."""
+
+
+def apply_transition(
+    db: Session,
+    ticket: Ticket,
+    event: str,
+    actor: User,
+    *,
+    values: Optional[dict] = None,
+    team_id: Optional[int] = None,
+    notes: Optional[str] = None,
+    notify: Recipients = (),
+    before_commit: Optional[Callable[[Ticket, TicketEvent], None]] = None,
+) -> Ticket:
+    """
+    Move ``ticket`` along ``event`` and commit. ``values`` are further column
+    changes; ``before_commit`` may add rows that belong to the same
+    transaction. Raises ``InvalidTransition`` if the ticket is not in a
+    status the transition starts from, and ``StaleTicket`` if its version
+    moved on since it was read.
+    """
+    transition = TRANSITIONS[event]
+    if ticket.status not in transition.sources:
+        raise InvalidTransition(f"Cannot apply {event} to a {ticket.status.value} ticket")
+
+    old_key, old_status = ticket_key(ticket), ticket.status
+    updated = db.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket.id, Ticket.version == ticket.version)
+        .values(status=transition.target, version=Ticket.version + 1, **(values or {}))
+        .returning(Ticket),
+        execution_options={"synchronize_session": "fetch"},
+    ).scalar_one_or_none()
+    if updated is None:
+        db.rollback()
+        raise StaleTicket(f"Ticket {ticket.id} was changed by someone else; reload and try again")
+
+    team_name = None
+    if team_id is not None:
+        team_name = func.coalesce(
+            select(Team.name).where(Team.id == team_id).scalar_subquery(), f"Team#{team_id}"
+        )
+    entry = db.execute(
+        insert(TicketEvent)
+        .values(
+            ticket_id=updated.id,
+            event=event,
+            actor=actor.full_name,
+            role=actor.role.value,
+            team_id=team_id,
+            team_name=team_name,
+            notes=notes,
+        )
+        .returning(TicketEvent)
+    ).scalar_one()
+
+    notify_users(db, notify, updated.id)
+    move_stats(db, old_key, ticket_key(updated))
+    record_transition(db, updated, old_status, event)
+
+    if before_commit is not None:
+        before_commit(updated, entry)
+    db.commit()
+    return updated
@@ -0,0 +1,216 @@
+"""
+Rendering benchmarks - measures how every document template scales with
+the number of line items, for each PDF backend.
+
+Each (document type, backend, size) case runs in a fresh process so its
+peak RSS is not inflated by earlier cases. A synthetic payload (see
+``app.services.documents.samples``) is rendered ``--runs`` times after one
+warm-up render; HTML generation and PDF printing are timed separately.
+
+Results are written as JSON together with the commit they were measured
+on, and can be compared against an earlier results file.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.utils.benchmark_rendering --output bench.json
+    docker compose exec backend python -m app.utils.benchmark_rendering \\
+        --types outbound_delivery --sizes 5 500 --backends playwright --runs 20
+    docker compose exec backend python -m app.utils.benchmark_rendering \\
+        --output new.json --compare old.json --threshold 10
+
+Exits non-zero when ``--compare`` finds a case more than ``--threshold``
+percent slower (p95) or larger than in the baseline.
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import multiprocessing
+import platform
+import queue as queue_module
+import resource
+import subprocess
+import sys
+import time
+
+from app.services.documents.backends import BACKENDS
+from app.services.documents.registry import DOCUMENT_TYPES
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [5, 50, 500]
+DEFAULT_RUNS = 10
+# Seconds before a case that has not reported back is abandoned
+CASE_TIMEOUT = 600
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples, p: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def latency(samples) -> dict:
+    return {f"p{p}": round(percentile(samples, p), 2) for p in PERCENTILES}
+
+
+def _run_case(document_type: str, backend_name: str, items: int, runs: int, queue) -> None:
+    """Benchmark one case. Runs in a child process."""
+    from app.services.documents.browser_pool import browser_pool
+    from app.services.documents.html_generator import render_html
+    from app.services.documents.samples import sample_payload
+
+    doc_type = DOCUMENT_TYPES[document_type]
+    backend = BACKENDS[backend_name]
+    payload = sample_payload(document_type, items)
+
+    if backend_name == "playwright":
+        # Measure warm renders, as served by the API, not browser launches
+        browser_pool.size = 1
+        browser_pool.start()
+
+    html_ms, pdf_ms = [], []
+    try:
+        for run in range(runs + 1):
+            started = time.perf_counter()
+            html = render_html(doc_type.template_name, payload)
+            rendered = time.perf_counter()
+            pdf = backend.render(html, landscape=doc_type.landscape)
+            printed = time.perf_counter()
+            if run:  # first run is the warm-up
+                html_ms.append((rendered - started) * 1000)
+                pdf_ms.append((printed - rendered) * 1000)
+    finally:
+        browser_pool.stop()
+
+    # ru_maxrss is in KiB on Linux. Chromium runs in child processes and is
+    # reported separately (largest descendant that has exited).
+    queue.put({
+        "document_type": document_type,
+        "template": doc_type.template_name,
+        "backend": backend_name,
+        "items": items,
+        "runs": runs,
+        "html_ms": latency(html_ms),
+        "pdf_ms": latency(pdf_ms),
+        "total_ms": latency([h + p for h, p in zip(html_ms, pdf_ms)]),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "peak_child_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        "html_bytes": len(html.encode()),
+        "pdf_bytes": len(pdf),
+    })
+
+
+def run_case(document_type: str, backend_name: str, items: int, runs: int):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_case, args=(document_type, backend_name, items, runs, queue))
+    process.start()
+    result = None
+    deadline = time.monotonic() + CASE_TIMEOUT
+    while result is None and time.monotonic() < deadline:
+        try:
+            result = queue.get(timeout=1)
+        except queue_module.Empty:
+            if not process.is_alive():
+                break
+    if process.is_alive() and result is None:
+        process.terminate()
+    process.join()
+    if result is None:
+        logger.error("%s/%s/%d items: failed (exit code %s)", document_type, backend_name, items, process.exitcode)
+    return result
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def case_key(result: dict) -> tuple:
+    return result["document_type"], result["backend"], result["items"]
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Log the change of every case against ``baseline``; count regressions."""
+    previous = {case_key(r): r for r in baseline["results"]}
+    regressions = 0
+    logger.info("Comparing against %s (%s)", baseline.get("commit"), baseline.get("timestamp"))
+    for result in current["results"]:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+        changes = {
+            "p95": (before["total_ms"]["p95"], result["total_ms"]["p95"]),
+            "rss": (before["peak_rss_kb"], result["peak_rss_kb"]),
+            "size": (before["pdf_bytes"], result["pdf_bytes"]),
+        }
+        deltas = {name: (new - old) * 100 / old if old else 0.0 for name, (old, new) in changes.items()}
+        regressed = [name for name, delta in deltas.items() if delta > threshold]
+        regressions += bool(regressed)
+        (logger.warning if regressed else logger.info)(
+            "%-24s %-10s %4d items: p95 %+6.1f%%  rss %+6.1f%%  size %+6.1f%%%s",
+            *case_key(result), deltas["p95"], deltas["rss"], deltas["size"],
+            "  REGRESSED" if regressed else "",
+        )
+    return regressions
+
+
+def main(args) -> int:
+    results = []
+    for document_type in args.types:
+        for backend_name in args.backends:
+            for items in args.sizes:
+                result = run_case(document_type, backend_name, items, args.runs)
+                if result is None:
+                    continue
+                results.append(result)
+                logger.info(
+                    "%-24s %-10s %4d items: p50 %8.1f ms  p95 %8.1f ms  p99 %8.1f ms  rss %7d KiB  %8d bytes",
+                    document_type, backend_name, items,
+                    result["total_ms"]["p50"], result["total_ms"]["p95"], result["total_ms"]["p99"],
+                    result["peak_rss_kb"], result["pdf_bytes"],
+                )
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": args.runs,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info("Wrote %d result(s) to %s", len(results), args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            logger.error("%d case(s) regressed by more than %.0f%%", regressions, args.threshold)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering per template and backend")
+    parser.add_argument("--types", nargs="+", choices=sorted(DOCUMENT_TYPES), default=sorted(DOCUMENT_TYPES),
+                        help="document types to benchmark")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS),
+                        help="PDF backends to benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="line-item counts")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="measured renders per case")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent increase counted as a regression")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,194 @@
+"""
+Query-count check - verifies that ticket endpoints run a fixed number of
+SQL queries however many rows they return.
+
+Seeds tickets (each with documents and history) inside a transaction,
+calls the ticket endpoints with small and large result sizes, serializes
+the responses the way FastAPI does, and compares the number of queries.
+Everything is rolled back afterwards, so it is safe to run against a
+development database.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.utils.check_query_counts
+    docker compose exec backend python -m app.utils.check_query_counts --sizes 10 1000
+
+Exits non-zero when an endpoint's query count grows with the row count.
+"""
+import argparse
+import logging
+import sys
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Union
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.api.v1.endpoints import comments as comment_endpoints, tickets as endpoints
+from app.core.database import engine
+from app.models.document import TicketDocument
+from app.models.team import Team
+from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket_event import TicketEvent
+from app.models.user import User, UserRole
+from app.schemas.ticket import Ticket as TicketSchema, TicketAllocate, TicketEvent as TicketEventSchema, TicketPage
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+# Enough of an ASGI scope for endpoints that read the query string
+REQUEST_SCOPE = {"type": "http", "path": "/api/v1/tickets/", "query_string": b"", "headers": []}
+
+LIST_RESPONSE = TypeAdapter(Union[List[TicketSchema], List[Dict[str, Any]], TicketPage])
+TICKET_RESPONSE = TypeAdapter(TicketSchema)
+HISTORY_RESPONSE = TypeAdapter(List[TicketEventSchema])
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@contextmanager
+def counting(connection):
+    counter = QueryCounter()
+    event.listen(connection, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(connection, "before_cursor_execute", counter)
+
+
+def seed(db: Session, tickets: int, children: int, members: int = 1):
+    """
+    Create a team of ``members`` users, a G1 and a UNIT user, and ``tickets``
+    tickets with ``children`` documents/events each.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    team = Team(name=f"query-check-{suffix}")
+    db.add(team)
+    db.flush()
+
+    def user(role, **kwargs):
+        u = User(email=f"query-check-{role.value.lower()}-{suffix}@example.com", hashed_password="-",
+                 full_name=f"Query check {role.value}", role=role, **kwargs)
+        db.add(u)
+        return u
+
+    g1, unit, member = user(UserRole.G1), user(UserRole.UNIT), user(UserRole.TEAM, team_id=team.id)
+    db.add_all(
+        User(email=f"query-check-member{i}-{suffix}@example.com", hashed_password="-",
+             full_name=f"Query check member {i}", role=UserRole.TEAM, team_id=team.id)
+        for i in range(1, members)
+    )
+    db.flush()
+
+    created = []
+    for i in range(tickets):
+        ticket = Ticket(title=f"Query check {i}", description="-", created_by_id=unit.id,
+                        assigned_team_id=team.id, resolved_by_id=member.id, status=TicketStatus.ALLOCATED)
+        db.add(ticket)
+        created.append(ticket)
+    db.flush()
+
+    rows = []
+    for ticket in created:
+        for j in range(children):
+            rows.append(TicketEvent(ticket_id=ticket.id, event="COMMENT_ADDED", actor=unit.full_name, role="UNIT"))
+            rows.append(TicketDocument(ticket_id=ticket.id, file_id=str(uuid.uuid4()),
+                                       template_name="voucher.html", document_type="voucher"))
+    db.add_all(rows)
+    db.flush()
+    db.expunge_all()
+    return db.get(User, g1.id), db.get(User, unit.id), [t.id for t in created], team.id
+
+
+def measure(connection, db: Session, call) -> int:
+    db.expire_all()
+    with counting(connection) as counter:
+        call()
+    return counter.count
+
+
+def check(sizes) -> bool:
+    small, large = min(sizes), max(sizes)
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Endpoint commits become savepoints inside the outer transaction
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        g1, unit, ticket_ids, team_id = seed(db, large, 1)
+        _, _, (busy_ticket,), _ = seed(db, 1, large)
+        _, _, (quiet_ticket,), _ = seed(db, 1, small)
+        _, _, (small_team_ticket,), small_team = seed(db, 1, 1, members=small)
+        _, _, (large_team_ticket,), large_team = seed(db, 1, 1, members=large)
+
+        def list_offset(limit, user, view="full"):
+            return lambda: LIST_RESPONSE.validate_python(endpoints.read_tickets(
+                db=db, skip=0, limit=limit, status=None, cursor=None, sort="created",
+                fields=None, view=view, request=Request(REQUEST_SCOPE), response=Response(),
+                if_none_match=None, current_user=user))
+
+        def list_cursor(limit, user):
+            return lambda: LIST_RESPONSE.validate_python(endpoints.read_tickets(
+                db=db, skip=0, limit=limit, status=None, cursor="", sort="priority",
+                fields=None, view="full", request=Request(REQUEST_SCOPE), response=Response(),
+                if_none_match=None, current_user=user))
+
+        def read_one(ticket_id):
+            return lambda: TICKET_RESPONSE.validate_python(endpoints.read_ticket(
+                db=db, ticket_id=ticket_id, response=Response(), if_none_match=None, current_user=g1))
+
+        def history(ticket_id):
+            return lambda: HISTORY_RESPONSE.validate_python(endpoints.read_ticket_history(
+                db=db, ticket_id=ticket_id, skip=0, limit=500, current_user=g1))
+
+        def allocate(ticket_id, team=team_id):
+            return lambda: TICKET_RESPONSE.validate_python(endpoints.allocate_ticket(
+                db=db, ticket_id=ticket_id, allocation=TicketAllocate(team_id=team),
+                response=Response(), if_match=None, current_user=g1))
+
+        def comment(ticket_id):
+            return lambda: comment_endpoints.create_comment(
+                ticket_id=ticket_id, comment_data={"content": "Query check"}, db=db, current_user=g1)
+
+        cases = {
+            "GET /tickets/ (G1)": (list_offset(small, g1), list_offset(large, g1)),
+            "GET /tickets/ (UNIT)": (list_offset(small, unit), list_offset(large, unit)),
+            "GET /tickets/?cursor=": (list_cursor(small, g1), list_cursor(large, g1)),
+            "GET /tickets/?view=summary": (list_offset(small, g1, "summary"), list_offset(large, g1, "summary")),
+            "GET /tickets/{id}": (read_one(quiet_ticket), read_one(busy_ticket)),
+            "GET /tickets/{id}/history": (history(quiet_ticket), history(busy_ticket)),
+            "PATCH /tickets/{id}/allocate": (allocate(quiet_ticket), allocate(busy_ticket)),
+            # Notification fan-out: the team size varies instead of the row count
+            "POST /tickets/{id}/comments": (comment(small_team_ticket), comment(large_team_ticket)),
+            "allocate to a team": (allocate(small_team_ticket, small_team), allocate(large_team_ticket, large_team)),
+        }
+
+        ok = True
+        for name, (few, many) in cases.items():
+            few_queries, many_queries = measure(connection, db, few), measure(connection, db, many)
+            flat = many_queries <= few_queries
+            ok &= flat
+            (logger.info if flat else logger.error)(
+                "%-30s %4d rows: %3d queries   %4d rows: %3d queries%s",
+                name, small, few_queries, large, many_queries, "" if flat else "   GROWS WITH ROWS",
+            )
+        return ok
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that ticket endpoints avoid N+1 queries")
+    parser.add_argument("--sizes", nargs=2, type=int, default=[10, 1000], metavar=("FEW", "MANY"),
+                        help="row counts to compare")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.sizes) else 1)
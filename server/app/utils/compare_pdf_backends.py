@@ -0,0 +1,110 @@
+"""
+Compare PDF backends - renders every document type with each backend and
+checks that the cheaper backends produce the same document as Chromium.
+
+For each type a synthetic payload is rendered through every backend; the
+page count and the extracted text (as a multiset of words, so differences in
+line wrapping are ignored) are compared against the ``playwright`` output.
+Run this before switching a document type's ``pdf_backend`` in the registry.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.utils.compare_pdf_backends
+    docker compose exec backend python -m app.utils.compare_pdf_backends --types voucher --items 5 40
+
+Exits non-zero when any backend's output differs from the reference.
+"""
+import argparse
+import logging
+import sys
+import time
+from collections import Counter
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from app.services.documents.backends import BACKENDS, PlaywrightBackend
+from app.services.documents.html_generator import render_html
+from app.services.documents.registry import DOCUMENT_TYPES
+from app.services.documents.samples import sample_payload
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+REFERENCE = PlaywrightBackend.name
+
+
+def summarize(pdf: bytes):
+    reader = PdfReader(BytesIO(pdf))
+    words = Counter()
+    for page in reader.pages:
+        words.update((page.extract_text() or "").split())
+    return len(reader.pages), words
+
+
+def compare(document_type: str, items: int) -> bool:
+    doc_type = DOCUMENT_TYPES[document_type]
+    html = render_html(doc_type.template_name, sample_payload(document_type, items))
+
+    results = {}
+    for name, backend in BACKENDS.items():
+        started = time.perf_counter()
+        try:
+            pdf = backend.render(html, landscape=doc_type.landscape)
+        except Exception as e:
+            logger.error("%s/%d items: %s failed: %s", document_type, items, name, e)
+            results[name] = None
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        pages, words = summarize(pdf)
+        results[name] = (pages, words)
+        logger.info("%s/%d items: %-10s %2d page(s) %6d bytes %8.1f ms",
+                    document_type, items, name, pages, len(pdf), elapsed)
+
+    reference = results.get(REFERENCE)
+    if reference is None:
+        logger.error("%s/%d items: no %s reference to compare against", document_type, items, REFERENCE)
+        return False
+
+    ok = True
+    for name, result in results.items():
+        if name == REFERENCE:
+            continue
+        if result is None:
+            ok = False
+            continue
+        pages, words = result
+        if pages != reference[0]:
+            logger.error("%s/%d items: %s has %d page(s), %s has %d",
+                         document_type, items, name, pages, REFERENCE, reference[0])
+            ok = False
+        missing = reference[1] - words
+        extra = words - reference[1]
+        if missing or extra:
+            logger.error("%s/%d items: %s text differs (missing %s, extra %s)",
+                         document_type, items, name,
+                         sorted(missing.elements())[:10], sorted(extra.elements())[:10])
+            ok = False
+    return ok
+
+
+def main(types, sizes) -> int:
+    failures = [
+        f"{document_type}/{items}"
+        for document_type in types
+        for items in sizes
+        if not compare(document_type, items)
+    ]
+    if failures:
+        logger.error("Backends disagree for: %s", ", ".join(failures))
+        return 1
+    logger.info("All backends agree.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare PDF backends against Chromium")
+    parser.add_argument("--types", nargs="+", choices=sorted(DOCUMENT_TYPES), default=sorted(DOCUMENT_TYPES),
+                        help="document types to compare")
+    parser.add_argument("--items", nargs="+", type=int, default=[1, 25], help="line-item counts to render")
+    args = parser.parse_args()
+    sys.exit(main(args.types, args.items))
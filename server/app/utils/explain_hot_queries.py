@@ -0,0 +1,184 @@
+"""
+EXPLAIN the hot queries - confirms each one is served by the index that
+was added for it.
+
+Every query is built the way the endpoints build it and run through
+``EXPLAIN (FORMAT JSON)``; the script fails if the expected index does not
+appear in the plan. On a small development database Postgres rightly
+prefers sequential scans, so by default synthetic rows are inserted and
+analyzed first, inside a transaction that is rolled back at the end.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.utils.explain_hot_queries
+    docker compose exec backend python -m app.utils.explain_hot_queries --seed 0 --verbose
+
+Exits non-zero when a query does not use its index.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from sqlalchemy import func, literal, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.models.comment import Comment
+from app.models.document import TicketDocument
+from app.models.notification import Notification
+from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket_event import TicketEvent
+from app.models.user import User, UserRole
+from app.services.tickets.changes import feed_page
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+SEED_TABLES = ("teams", "users", "tickets", "notifications", "comments", "ticket_documents", "ticket_events")
+
+# Synthetic rows scaled by --seed (number of tickets); ids are offset so
+# they never collide with real rows.
+SEED_SQL = """
+INSERT INTO teams (id, name, description)
+SELECT 900000 + g, 'explain-team-' || g, '' FROM generate_series(1, 20) g;
+
+INSERT INTO users (id, email, hashed_password, full_name, is_active, role, team_id)
+SELECT 900000 + g, 'explain-' || g || '@example.com', '-', 'Explain ' || g, true,
+       (CASE WHEN g <= 5 THEN 'G1' WHEN g % 3 = 0 THEN 'TEAM' ELSE 'UNIT' END)::userrole,
+       CASE WHEN g > 5 AND g % 3 = 0 THEN 900001 + g % 20 END
+FROM generate_series(1, :users) g;
+
+INSERT INTO tickets (id, title, description, status, priority, created_by_id, assigned_team_id, created_at, updated_at)
+SELECT 9000000 + g, 'Explain ticket ' || g, '-',
+       (ARRAY['OPEN', 'ALLOCATED', 'RESOLVED', 'CLOSED'])[1 + g % 4]::ticketstatus,
+       (ARRAY['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'])[1 + g % 4]::ticketpriority,
+       900006 + g % (:users - 5),
+       CASE WHEN g % 4 > 0 THEN 900001 + g % 20 END,
+       now() - g * interval '1 minute', now() - g * interval '1 minute'
+FROM generate_series(1, :tickets) g;
+
+INSERT INTO notifications (message, is_read, recipient_id, ticket_id, created_at)
+SELECT '-', g % 2 = 0, 900001 + g % :users, 9000001 + g % :tickets, now() - g * interval '1 second'
+FROM generate_series(1, :tickets * 3) g;
+
+INSERT INTO comments (content, ticket_id, user_id, created_at)
+SELECT '-', 9000001 + g % :tickets, 900006 + g % (:users - 5), now() - g * interval '1 second'
+FROM generate_series(1, :tickets) g;
+
+INSERT INTO ticket_documents (ticket_id, file_id, template_name, document_type, created_at)
+SELECT 9000001 + g % :tickets, 'explain-' || g, 'voucher.html', 'voucher', now()
+FROM generate_series(1, :tickets / 2) g;
+
+INSERT INTO ticket_events (ticket_id, event, actor, role, ts)
+SELECT 9000001 + g % :tickets, 'COMMENT_ADDED', 'Explain ' || g % 100, 'UNIT', now() - g * interval '1 second'
+FROM generate_series(1, :tickets * 3) g;
+"""
+
+
+def hot_queries(db: Session, user_id: int, team_id: int, ticket_id: int):
+    """(name, query, expected index) for each hot path, built like the endpoints."""
+    newest = (Ticket.created_at.desc(), Ticket.id.desc())
+    # The seeding transaction, which wrote every synthetic ticket
+    xid = db.execute(text("SELECT pg_current_xact_id()::text::bigint")).scalar()
+    return [
+        ("UNIT ticket list", db.query(Ticket).filter(Ticket.created_by_id == user_id).order_by(*newest).limit(50),
+         "ix_tickets_created_by_id_created_at"),
+        ("TEAM ticket list", db.query(Ticket).filter(Ticket.assigned_team_id == team_id).order_by(*newest).limit(50),
+         "ix_tickets_assigned_team_id_created_at"),
+        ("tickets by status", db.query(Ticket).filter(Ticket.status == TicketStatus.OPEN).order_by(*newest).limit(50),
+         "ix_tickets_status_created_at"),
+        ("G1 ticket list", db.query(Ticket).order_by(*newest).limit(50),
+         "ix_tickets_created_at"),
+        ("tickets by priority",
+         db.query(Ticket).order_by(Ticket.priority.desc(), *newest).limit(50),
+         "ix_tickets_priority_created_at"),
+        ("notifications",
+         db.query(Notification).filter(Notification.recipient_id == user_id)
+         .order_by(Notification.created_at.desc()).limit(50),
+         "ix_notifications_recipient_id_created_at"),
+        ("ticket comments",
+         db.query(Comment).filter(Comment.ticket_id == ticket_id).order_by(Comment.created_at.asc()),
+         "ix_comments_ticket_id_created_at"),
+        ("ticket documents", db.query(TicketDocument).filter(TicketDocument.ticket_id == ticket_id),
+         "ix_ticket_documents_ticket_id"),
+        ("ticket history",
+         db.query(TicketEvent).filter(TicketEvent.ticket_id == ticket_id).order_by(TicketEvent.ts, TicketEvent.id),
+         "ix_ticket_events_ticket_id_ts"),
+        ("ticket search",
+         db.query(Ticket.id).filter(Ticket.search_vector.op("@@")(func.websearch_to_tsquery("english", "ticket 42"))),
+         "ix_tickets_search_vector"),
+        ("fuzzy title search", db.query(Ticket.id).filter(literal("tickte").op("<%")(Ticket.title)),
+         "ix_tickets_title_trgm"),
+        ("ticket changes", feed_page(db.query(Ticket), (xid, 0), xid + 1, 100),
+         "ix_tickets_change_xid"),
+        ("G1 users", db.query(User).filter(User.role == UserRole.G1),
+         "ix_users_role"),
+        ("team members", db.query(User).filter(User.team_id == team_id),
+         "ix_users_team_id"),
+    ]
+
+
+def plan_indexes(plan: dict) -> set:
+    found = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+def explain(db: Session, query) -> dict:
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    result = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params)
+    plan = result.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def check(seed: int, verbose: bool) -> bool:
+    db = Session(bind=engine)
+    try:
+        if seed:
+            users = max(50, seed // 20)
+            for statement in SEED_SQL.split(";"):
+                if statement.strip():
+                    db.execute(text(statement), {"users": users, "tickets": seed})
+            for table in SEED_TABLES:
+                db.execute(text(f"ANALYZE {table}"))
+
+        # Pick real ids so the plans reflect typical selectivity
+        user_id = db.query(Ticket.created_by_id).order_by(Ticket.id.desc()).limit(1).scalar()
+        team_id = db.query(User.team_id).filter(User.team_id.isnot(None)).order_by(User.id.desc()).limit(1).scalar()
+        ticket_id = db.query(Comment.ticket_id).order_by(Comment.id.desc()).limit(1).scalar()
+        if user_id is None or team_id is None or ticket_id is None:
+            logger.error("Database has no tickets/teams/comments to explain against; use --seed")
+            return False
+
+        ok = True
+        for name, query, index in hot_queries(db, user_id, team_id, ticket_id):
+            plan = explain(db, query)
+            used = plan_indexes(plan)
+            hit = index in used
+            ok &= hit
+            (logger.info if hit else logger.error)(
+                "%-22s %-42s %s", name, index, "used" if hit else f"NOT USED (plan uses: {', '.join(sorted(used)) or 'no index'})"
+            )
+            if verbose or not hit:
+                logger.info("%s", json.dumps(plan, indent=2))
+        return ok
+    finally:
+        db.rollback()
+        db.close()
+        if seed:
+            # Planner statistics are transactional but reltuples is not; refresh them
+            with engine.connect() as connection:
+                for table in SEED_TABLES:
+                    connection.execute(text(f"ANALYZE {table}"))
+                connection.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the hot queries use their indexes")
+    parser.add_argument("--seed", type=int, default=20000,
+                        help="synthetic tickets to insert (rolled back afterwards); 0 to use existing data")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.seed, args.verbose) else 1)
@@ -0,0 +1,50 @@
+"""
+Helpers for HTTP conditional requests (ETag / Last-Modified validators).
+"""
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+
+def quote_etag(value: str, weak: bool = False) -> str:
+    """Format ``value`` as an entity tag header value."""
+    return f'{"W/" if weak else ""}"{value}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def precondition_failed(if_match: Optional[str], etag: str) -> bool:
+    """
+    True if an ``If-Match`` header is present and does not match ``etag``.
+    Compares weakly, so a weak ETag from an earlier response can be sent back.
+    """
+    return bool(if_match) and not etag_matches(if_match, etag)
+
+
+def http_date(timestamp: float) -> str:
+    """Format a POSIX timestamp as an HTTP date."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def not_modified_since(if_modified_since: Optional[str], timestamp: Optional[float]) -> bool:
+    """True if the resource last modified at ``timestamp`` is not newer than the header."""
+    if not if_modified_since or timestamp is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(timestamp) <= int(since)
@@ -0,0 +1,53 @@
+"""
+Bulk-import tickets from a CSV or NDJSON file (see
+app/services/tickets/bulk_import.py). Rows that fail validation are
+listed with their line number and skipped; the rest load in one transaction.
+
+Usage (via Docker):
+    docker compose exec backend python -m app.utils.import_tickets legacy.csv --created-by unit@example.com
+    docker compose exec backend python -m app.utils.import_tickets legacy.ndjson --created-by unit@example.com --notify
+
+Exits non-zero when any row was rejected.
+"""
+import argparse
+import logging
+import sys
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.tickets.bulk_import import FORMATS, import_tickets
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main(path: str, fmt: str, created_by: str, notify: bool, dry_run: bool) -> bool:
+    db = SessionLocal()
+    try:
+        creator = db.query(User).filter(User.email == created_by).first()
+        if creator is None:
+            logger.error("No user with email %s", created_by)
+            return False
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = import_tickets(db, stream, fmt, creator, creator, notify=notify, dry_run=dry_run)
+        for error in report.errors:
+            logger.error("line %d: %s", error["line"], error["error"])
+        logger.info("%s %d ticket(s), rejected %d", "Validated" if dry_run else "Imported",
+                    report.imported, report.failed)
+        return report.failed == 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import tickets from CSV or NDJSON")
+    parser.add_argument("path", help="file to import")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--created-by", required=True, metavar="EMAIL", help="user the tickets are raised by")
+    parser.add_argument("--notify", action="store_true", help="send G1 users one summary notification")
+    parser.add_argument("--dry-run", action="store_true", help="only validate the rows")
+    args = parser.parse_args()
+    fmt = args.format or args.path.rsplit(".", 1)[-1].lower()
+    if fmt not in FORMATS:
+        parser.error("cannot tell the format from the file name; pass --format")
+    sys.exit(0 if main(args.path, fmt, args.created_by, args.notify, args.dry_run) else 1)
@@ -17,6 +17,8 @@ from app.models.user import User, UserRole
 from app.models.team import Team
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.core.security import get_password_hash
+from app.services.tickets.analytics import start_metrics
+from app.services.tickets.stats import reconcile as reconcile_stats
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -196,11 +198,15 @@ def seed_db(force: bool = False):
                     assigned_team_id=assigned_team.id if assigned_team else None,
                 )
                 db.add(obj)
+                start_metrics(db, obj)
                 logger.info(f"  ➕ Ticket: {tk['title'][:50]}")
             else:
                 logger.info(f"  ⏭️  Ticket already exists: {tk['title'][:50]}")
         db.commit()
 
+        # Seeded tickets bypass the endpoints, so recount the dashboard counters
+        reconcile_stats(db)
+
         logger.info("\n✅ Database seeded successfully!")
         logger.info(f"   Teams: {len(TEAMS)} | Users: {len(USERS)} | Tickets: {len(TICKETS)}")
 